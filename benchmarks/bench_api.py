@@ -0,0 +1,346 @@
+"""
+Load test of the API: seeds a synthetic board, drives every endpoint with
+concurrent clients and reports throughput and latency percentiles, compared
+against a stored baseline.
+
+Requests go through the whole Django stack (middleware, authentication,
+views, database) in-process, each client in its own thread with its own
+database connection, so the numbers include everything but the network and
+the application server.
+
+Usage: python benchmarks/bench_api.py [--clients N] [--requests N] [--warmup N]
+       [--tasks N] [--users N] [--contacts N] [--only NAME ...]
+       [--baseline PATH] [--save-baseline] [--tolerance 0.25]
+
+Exits with status 1 when an endpoint's throughput dropped or its p95
+latency grew by more than the tolerance. Baselines are only comparable on
+the machine and with the scale options they were recorded with.
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from common import percentile, print_table, seed_board, test_database
+
+from django.db import connection
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def get_scenarios(board):
+    """
+    One request per endpoint in join_backend/urls.py, except those that
+    would take away what the other requests need (logout, delete_user and
+    the DELETEs) and password reset, which sends e-mails. Each entry is
+    (name, method, path, data), the path and data may be callables taking a
+    running counter, so writes do not collide.
+    """
+    task_ids = board["task_ids"]
+    contact_ids = board["contact_ids"]
+    user_ids = board["user_ids"]
+
+    def task_path(i):
+        return f"/tasks/{task_ids[i % len(task_ids)]}/"
+
+    def new_task(i):
+        return {
+            "title": f"Load {i}",
+            "description": "Created by bench_api",
+            "due_date": "2030-01-01",
+            "status": "todo",
+            "priority": "medium",
+            "category": board["category_id"],
+            "assigned_users": board["user_ids"][:2],
+        }
+
+    return [
+        ("login", "post", "/login/", board["credentials"]),
+        ("login lean", "post", "/login/?contacts=false", board["credentials"]),
+        ("check_auth", "get", "/check_auth/", None),
+        ("tasks", "get", "/tasks/", None),
+        ("tasks filtered", "get", "/tasks/?status=todo&priority=urgent", None),
+        ("tasks page", "get", "/tasks/?limit=50", None),
+        ("tasks since", "get", "/tasks/?since=", None),
+        ("tasks summary", "get", "/tasks/summary/", None),
+        ("tasks archive", "get", "/tasks/archive/?limit=50", None),
+        (
+            "user tasks",
+            "get",
+            lambda i: f"/users/{user_ids[i % len(user_ids)]}/tasks/",
+            None,
+        ),
+        ("task create", "post", "/tasks/", new_task),
+        ("task update", "patch", task_path, lambda i: {"status": "inprogress"}),
+        (
+            "tasks bulk",
+            "post",
+            "/tasks/bulk/",
+            lambda i: {
+                "update": [
+                    {"id": task_ids[(i * 10 + n) % len(task_ids)], "priority": "low"}
+                    for n in range(10)
+                ]
+            },
+        ),
+        (
+            "subtask create",
+            "post",
+            lambda i: f"{task_path(i)}subtasks/",
+            lambda i: {"title": f"Step {i}"},
+        ),
+        ("categories", "get", "/categorys/", None),
+        ("users", "get", "/users/", None),
+        ("metrics", "get", "/metrics/", None),
+        ("contacts", "get", "/contacts/", None),
+        ("contacts page", "get", "/contacts/?limit=50", None),
+        ("contacts search", "get", "/contacts/?search=contact", None),
+        (
+            "contact update",
+            "patch",
+            lambda i: f"/contacts/{contact_ids[i % len(contact_ids)]}/",
+            lambda i: {
+                "name": f"Contact {i}",
+                "email": f"contact{i}@example.com",
+                "phone": "0123456789",
+                "initials": "CO",
+                "color": "#ff7a00",
+            },
+        ),
+        (
+            "register",
+            "post",
+            "/create_user/",
+            lambda i: {
+                "username": f"load{i}",
+                "email": f"load{i}@example.com",
+                "password": "load-password",
+                "firstname": "Load",
+                "lastname": "Test",
+                "initials": "LT",
+                "color": "#000",
+            },
+        ),
+    ]
+
+
+def resolve(value, i):
+    return value(i) if callable(value) else value
+
+
+def run_scenario(scenario, tokens, clients, requests, offset=0):
+    """
+    Send `requests` requests from `clients` threads and return the latencies
+    in ms, the number of failed requests and the wall clock time in seconds.
+    The running counter starts at `offset`.
+    """
+    name, method, path, data = scenario
+    counter = itertools.count(offset)
+    latencies, errors = [], []
+    lock = threading.Lock()
+    start = threading.Barrier(clients + 1)
+
+    def client_thread(token):
+        client = APIClient(raise_request_exception=False)
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token}")
+        local_latencies, local_errors = [], 0
+        start.wait()
+
+        try:
+            while True:
+                with lock:
+                    i = next(counter)
+                if i >= offset + requests:
+                    break
+
+                kwargs = {"format": "json"} if method != "get" else {}
+                began = time.perf_counter()
+                response = getattr(client, method)(
+                    resolve(path, i), resolve(data, i), **kwargs
+                )
+                local_latencies.append((time.perf_counter() - began) * 1000)
+                if response.status_code >= 400:
+                    local_errors += 1
+        finally:
+            connection.close()
+
+        with lock:
+            latencies.extend(local_latencies)
+            errors.append(local_errors)
+
+    threads = [
+        threading.Thread(target=client_thread, args=(tokens[n % len(tokens)],))
+        for n in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+
+    return latencies, sum(errors), time.perf_counter() - began
+
+
+def compare(result, baseline, tolerance):
+    """
+    Return a verdict for one endpoint against its baseline entry.
+    """
+    if baseline is None:
+        return "new"
+
+    slower = result["p95"] > baseline["p95"] * (1 + tolerance)
+    fewer = result["rps"] < baseline["rps"] * (1 - tolerance)
+
+    if slower or fewer:
+        return "REGRESSION"
+
+    return f"{result['rps'] / baseline['rps'] - 1:+.0%} rps"
+
+
+def seed(args):
+    from django.utils import timezone
+
+    from join.archive import archive_tasks
+    from join.models import Category, Contact, CustomUser, Task
+
+    seed_board(
+        users=args.users,
+        tasks=args.tasks,
+        contacts=args.contacts,
+        categories=args.categories,
+        assignees=args.assignees,
+        subtasks=args.subtasks,
+    )
+    password = "bench-password"
+    first = CustomUser.objects.order_by("id").first()
+    first.set_password(password)
+    first.save()
+
+    # A tenth of the board has been archived.
+    archived = Task.objects.order_by("id").values_list("id", flat=True)
+    Task.objects.filter(pk__in=list(archived[: args.tasks // 10])).update(
+        status="done", updated_at=timezone.now() - datetime.timedelta(days=365)
+    )
+    archive_tasks()
+
+    users = list(CustomUser.objects.order_by("id")[: args.clients])
+    # Staff, for /metrics/.
+    CustomUser.objects.filter(pk__in=[user.pk for user in users]).update(
+        is_staff=True
+    )
+    return {
+        "tokens": [Token.objects.get_or_create(user=user)[0].key for user in users],
+        "credentials": {"username": first.username, "password": password},
+        "user_ids": [user.pk for user in users],
+        "task_ids": list(Task.objects.values_list("id", flat=True)),
+        "contact_ids": list(
+            Contact.objects.filter(user=first).values_list("id", flat=True)
+        ),
+        "category_id": Category.objects.values_list("id", flat=True).first(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="Per endpoint.")
+    parser.add_argument("--warmup", type=int, default=16, help="Per endpoint.")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=500)
+    parser.add_argument("--contacts", type=int, default=200)
+    parser.add_argument("--categories", type=int, default=5)
+    parser.add_argument("--assignees", type=int, default=3)
+    parser.add_argument("--subtasks", type=int, default=3)
+    parser.add_argument("--only", nargs="*", help="Endpoint names to run.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    config = {
+        name: getattr(args, name)
+        for name in (
+            "clients",
+            "users",
+            "tasks",
+            "contacts",
+            "categories",
+            "assignees",
+            "subtasks",
+        )
+    }
+    stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if stored and stored.get("config") != config:
+        print("Baseline was recorded with other options, not comparing.")
+        stored = {}
+
+    results, rows = {}, []
+
+    with tempfile.TemporaryDirectory() as directory:
+        with test_database(Path(directory) / "bench.sqlite3"):
+            board = seed(args)
+
+            for scenario in get_scenarios(board):
+                name = scenario[0]
+                if args.only and name not in args.only:
+                    continue
+
+                # Warm up caches and connections, then measure.
+                run_scenario(scenario, board["tokens"], args.clients, args.warmup)
+                latencies, errors, seconds = run_scenario(
+                    scenario,
+                    board["tokens"],
+                    args.clients,
+                    args.requests,
+                    offset=args.warmup,
+                )
+                result = {
+                    "rps": round(len(latencies) / seconds, 1),
+                    "p50": round(percentile(latencies, 50), 2),
+                    "p95": round(percentile(latencies, 95), 2),
+                    "p99": round(percentile(latencies, 99), 2),
+                }
+                results[name] = result
+                verdict = compare(
+                    result, stored.get("endpoints", {}).get(name), args.tolerance
+                )
+                rows.append(
+                    (
+                        name,
+                        f"{result['rps']:.0f}",
+                        f"{result['p50']:.1f}",
+                        f"{result['p95']:.1f}",
+                        f"{result['p99']:.1f}",
+                        errors,
+                        verdict,
+                    )
+                )
+
+    print_table(
+        ["endpoint", "req/s", "p50 ms", "p95 ms", "p99 ms", "errors", "vs baseline"],
+        rows,
+    )
+
+    if args.save_baseline:
+        endpoints = {**stored.get("endpoints", {}), **results}
+        args.baseline.write_text(
+            json.dumps({"config": config, "endpoints": endpoints}, indent=2) + "\n"
+        )
+        print(f"Baseline written to {args.baseline}")
+
+    if any(row[-1] == "REGRESSION" for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
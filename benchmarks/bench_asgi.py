@@ -0,0 +1,246 @@
+"""
+Concurrency scaling of the read endpoints served through the ASGI entry
+point (join_backend/asgi.py, as uvicorn runs it) versus the WSGI entry
+point (join_backend/wsgi.py, as a threaded WSGI server runs it).
+
+Both applications are driven in-process without a network: WSGI requests
+from one thread per client, ASGI requests from one coroutine per client on
+a single event loop. Besides throughput and latency the table shows the
+peak number of threads each needed.
+
+Usage: python benchmarks/bench_asgi.py [--clients 1 8 32 64] [--requests N]
+       [--only NAME ...] [--tasks N] [--users N]
+"""
+
+import argparse
+import asyncio
+import itertools
+import sys
+import tempfile
+import threading
+import time
+from io import BytesIO
+from pathlib import Path
+from wsgiref.util import setup_testing_defaults
+
+from common import percentile, print_table, seed_board, test_database
+
+from django.db import connection
+from join_backend.asgi import application as asgi_application
+from join_backend.wsgi import application as wsgi_application
+from rest_framework.authtoken.models import Token
+
+ENDPOINTS = [
+    ("check_auth", "/check_auth/", ""),
+    ("categories", "/categorys/", ""),
+    ("users", "/users/", ""),
+    ("tasks page", "/tasks/", "limit=50"),
+]
+
+
+class ThreadPeak:
+    """
+    Highest number of live threads seen while responses were being sent.
+    """
+
+    def __init__(self):
+        self.peak = threading.active_count()
+
+    def sample(self):
+        self.peak = max(self.peak, threading.active_count())
+
+
+def run_wsgi(application, path, query, token, clients, requests):
+    """
+    Send `requests` GET requests from `clients` threads and return the
+    latencies in ms, the non-2xx count, the seconds taken and the peak
+    thread count.
+    """
+    counter = itertools.count()
+    latencies, failures = [], []
+    lock = threading.Lock()
+    peak = ThreadPeak()
+    start = threading.Barrier(clients + 1)
+
+    def client_thread():
+        local_latencies, local_failures = [], 0
+        start.wait()
+
+        try:
+            while next(counter) < requests:
+                environ = {}
+                setup_testing_defaults(environ)
+                environ.update(
+                    {
+                        "PATH_INFO": path,
+                        "QUERY_STRING": query,
+                        "HTTP_AUTHORIZATION": f"Token {token}",
+                        "wsgi.input": BytesIO(),
+                    }
+                )
+                statuses = []
+
+                def start_response(status, headers):
+                    peak.sample()
+                    statuses.append(status)
+
+                began = time.perf_counter()
+                result = application(environ, start_response)
+                b"".join(result)
+                result.close()
+                local_latencies.append((time.perf_counter() - began) * 1000)
+
+                if not statuses[0].startswith("2"):
+                    local_failures += 1
+        finally:
+            connection.close()
+
+        with lock:
+            latencies.extend(local_latencies)
+            failures.append(local_failures)
+
+    threads = [threading.Thread(target=client_thread) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+
+    start.wait()
+    began = time.perf_counter()
+    for thread in threads:
+        thread.join()
+
+    return latencies, sum(failures), time.perf_counter() - began, peak.peak
+
+
+def run_asgi(application, path, query, token, clients, requests):
+    """
+    Same as `run_wsgi`, with `clients` concurrent coroutines.
+    """
+    counter = itertools.count()
+    latencies = []
+    failures = 0
+    peak = ThreadPeak()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [
+            (b"host", b"testserver"),
+            (b"authorization", f"Token {token}".encode()),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+
+    async def request():
+        messages = iter([{"type": "http.request", "body": b"", "more_body": False}])
+        status = None
+
+        async def receive():
+            message = next(messages, None)
+            if message is None:
+                # The client never disconnects early.
+                await asyncio.Event().wait()
+            return message
+
+        async def send(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                peak.sample()
+                status = message["status"]
+
+        await application(dict(scope), receive, send)
+        return status
+
+    async def client():
+        nonlocal failures
+
+        while next(counter) < requests:
+            began = time.perf_counter()
+            status = await request()
+            latencies.append((time.perf_counter() - began) * 1000)
+
+            if not 200 <= status < 300:
+                failures += 1
+
+    async def main():
+        began = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(clients)))
+        return time.perf_counter() - began
+
+    seconds = asyncio.run(main())
+    return latencies, failures, seconds, peak.peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--requests", type=int, default=400, help="Per run.")
+    parser.add_argument("--only", nargs="*", help="Endpoint names to run.")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=500)
+    args = parser.parse_args()
+
+    rows = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        with test_database(Path(directory) / "bench.sqlite3"):
+            user = seed_board(users=args.users, tasks=args.tasks, contacts=0)
+            token = Token.objects.create(user=user).key
+            connection.close()
+            servers = [
+                ("wsgi", wsgi_application, run_wsgi),
+                ("asgi", asgi_application, run_asgi),
+            ]
+
+            for name, path, query in ENDPOINTS:
+                if args.only and name not in args.only:
+                    continue
+
+                for clients, (server, application, run) in itertools.product(
+                    args.clients, servers
+                ):
+                    # Warm up caches and connections, then measure.
+                    run(application, path, query, token, clients, clients * 2)
+                    latencies, failures, seconds, threads = run(
+                        application, path, query, token, clients, args.requests
+                    )
+                    rows.append(
+                        (
+                            name,
+                            server,
+                            clients,
+                            f"{len(latencies) / seconds:.0f}",
+                            f"{percentile(latencies, 50):.1f}",
+                            f"{percentile(latencies, 95):.1f}",
+                            threads,
+                            failures,
+                        )
+                    )
+
+    print_table(
+        [
+            "endpoint",
+            "server",
+            "clients",
+            "req/s",
+            "p50 ms",
+            "p95 ms",
+            "peak threads",
+            "failures",
+        ],
+        rows,
+    )
+
+    if any(row[-1] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
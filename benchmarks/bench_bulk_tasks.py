@@ -0,0 +1,64 @@
+"""
+Compare moving a column of tasks with one PATCH per task against a single
+request to the bulk endpoint.
+
+Usage: python benchmarks/bench_bulk_tasks.py [--tasks N] [--repeat N]
+"""
+
+import argparse
+
+from common import (
+    count_queries,
+    measure,
+    print_table,
+    seed_board,
+    summarize,
+    test_database,
+)
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    from join.models import Task
+
+    with test_database():
+        user = seed_board(tasks=args.tasks)
+        client = APIClient()
+        token = Token.objects.create(user=user)
+        client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        ids = list(Task.objects.values_list("id", flat=True))
+        columns = iter(["todo", "inprogress"] * (args.repeat + 2))
+
+        def per_item():
+            column = next(columns)
+            for pk in ids:
+                client.patch(f"/tasks/{pk}/", {"status": column}, format="json")
+
+        def bulk():
+            column = next(columns)
+            client.post(
+                "/tasks/bulk/",
+                {"update": [{"id": pk, "status": column} for pk in ids]},
+                format="json",
+            )
+
+        rows = []
+        for name, func in [("per-item PATCH", per_item), ("bulk", bulk)]:
+            queries = count_queries(func)
+            stats = summarize(measure(func, args.repeat))
+            rows.append(
+                (name, len(ids), queries, f"{stats['p50']:.1f}", f"{stats['p95']:.1f}")
+            )
+
+        print_table(["path", "tasks", "queries", "p50 ms", "p95 ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
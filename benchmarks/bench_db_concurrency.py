@@ -0,0 +1,130 @@
+"""
+Concurrent write load against a file based SQLite database, comparing the
+stock settings (Django's backend, rollback journal, synchronous=FULL, a
+new connection per request) with the tuned profile (BEGIN IMMEDIATE, WAL,
+synchronous=NORMAL, persistent connections). With DB_ENGINE=postgres set,
+the PostgreSQL profile is run instead.
+
+Usage: python benchmarks/bench_db_concurrency.py [--writers N] [--readers N]
+       [--seconds N]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+PROFILES = {
+    "stock": {
+        "SQLITE_ENGINE": "django.db.backends.sqlite3",
+        "SQLITE_JOURNAL_MODE": "DELETE",
+        "SQLITE_SYNCHRONOUS": "FULL",
+        "DB_CONN_MAX_AGE": "0",
+    },
+    "tuned": {},
+}
+
+
+def run_worker(args):
+    from common import print_table  # noqa: F401  (sets up Django)
+
+    from django.core.management import call_command
+    from django.db import OperationalError, close_old_connections, connection
+
+    from join.models import Category, CustomUser, Task
+
+    call_command("migrate", verbosity=0)
+    user = CustomUser.objects.create(username="load", initials="LO", color="#000")
+    category = Category.objects.create(name="Load", color="#000")
+    stop = time.monotonic() + args.seconds
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+
+    def count(name):
+        with lock:
+            counts[name] += 1
+
+    def writer():
+        while time.monotonic() < stop:
+            # Emulates one request: the connection is released at its end.
+            close_old_connections()
+            try:
+                task = Task.objects.create(
+                    title="Load", description="", author=user, category=category
+                )
+                task.assigned_users.add(user)
+                count("writes")
+            except OperationalError:
+                count("locked")
+        connection.close()
+
+    def reader():
+        while time.monotonic() < stop:
+            close_old_connections()
+            try:
+                list(Task.objects.order_by("-id").values("id", "title")[:50])
+                count("reads")
+            except OperationalError:
+                count("locked")
+        connection.close()
+
+    threads = [threading.Thread(target=writer) for _ in range(args.writers)]
+    threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(json.dumps(counts))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        return run_worker(args)
+
+    from common import print_table
+
+    postgres = os.getenv("DB_ENGINE") == "postgres"
+    profiles = {"postgres": {}} if postgres else PROFILES
+    rows = []
+
+    for name, env in profiles.items():
+        with tempfile.TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                "SQLITE_PATH": os.path.join(directory, "load.sqlite3"),
+                **env,
+            }
+            output = subprocess.run(
+                [sys.executable, __file__, "--worker", *sys.argv[1:]],
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            counts = json.loads(output.strip().splitlines()[-1])
+            rows.append(
+                (
+                    name,
+                    f"{counts['writes'] / args.seconds:.0f}",
+                    f"{counts['reads'] / args.seconds:.0f}",
+                    counts["locked"],
+                )
+            )
+
+    print_table(["profile", "writes/s", "reads/s", "locked errors"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compare rendering time and bytes on the wire of the list endpoints with
+DRF's JSONRenderer and no compression against the FastJSONRenderer and the
+compression middleware.
+
+Usage: python benchmarks/bench_payloads.py [--tasks N] [--repeat N]
+"""
+
+import argparse
+
+from common import measure, print_table, seed_board, summarize, test_database
+
+from rest_framework.renderers import JSONRenderer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--contacts", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    from join.middleware import brotli, compress, get_compression_settings
+    from join.models import CustomUser, Task
+    from join.renderers import FastJSONRenderer, orjson
+    from join_backend.serializers import (
+        ContactValuesSerializer,
+        TaskValuesSerializer,
+        UserListValuesSerializer,
+    )
+
+    if orjson is None:
+        print("orjson is not installed, FastJSONRenderer falls back to json.")
+    if brotli is None:
+        print("brotli is not installed, only gzip is measured.")
+
+    config = get_compression_settings()
+    encodings = ["gzip"] + (["br"] if brotli is not None else [])
+
+    with test_database():
+        user = seed_board(users=args.users, tasks=args.tasks, contacts=args.contacts)
+        cases = [
+            ("tasks", TaskValuesSerializer, Task.objects.all),
+            ("users", UserListValuesSerializer, CustomUser.objects.all),
+            ("contacts", ContactValuesSerializer, user.contacts.all),
+        ]
+        rows = []
+
+        for name, serializer, queryset in cases:
+            data = serializer(queryset(), many=True).data
+            before = summarize(measure(lambda: JSONRenderer().render(data), args.repeat))
+            after = summarize(
+                measure(lambda: FastJSONRenderer().render(data), args.repeat)
+            )
+            content = FastJSONRenderer().render(data)
+            identical = content == JSONRenderer().render(data)
+
+            sizes = []
+            for encoding in encodings:
+                compressed = compress(content, encoding, config)
+                timing = summarize(
+                    measure(lambda: compress(content, encoding, config), args.repeat)
+                )
+                sizes.append(
+                    f"{encoding} {len(compressed) / 1024:.1f} KB "
+                    f"({timing['p50']:.1f} ms)"
+                )
+
+            rows.append(
+                (
+                    name,
+                    f"{before['p50']:.1f}",
+                    f"{after['p50']:.1f}",
+                    "yes" if identical else "NO",
+                    f"{len(content) / 1024:.1f} KB",
+                    ", ".join(sizes),
+                )
+            )
+
+        print_table(
+            [
+                "endpoint",
+                "json p50 ms",
+                "fast p50 ms",
+                "identical",
+                "uncompressed",
+                "compressed (p50)",
+            ],
+            rows,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare the DRF ModelSerializers with the `.values()` based serializers used
+by the hot list endpoints.
+
+Usage: python benchmarks/bench_serializers.py [--tasks N] [--repeat N]
+"""
+
+import argparse
+
+from common import measure, print_table, seed_board, summarize, test_database
+
+from rest_framework.renderers import JSONRenderer
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=2000)
+    parser.add_argument("--contacts", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    from join.models import CustomUser, Task
+    from join_backend.serializers import (
+        ContactSerializer,
+        ContactValuesSerializer,
+        TaskSerializer,
+        TaskValuesSerializer,
+        UserListSerializer,
+        UserListValuesSerializer,
+    )
+
+    with test_database():
+        user = seed_board(users=args.users, tasks=args.tasks, contacts=args.contacts)
+        cases = [
+            ("tasks", TaskSerializer, TaskValuesSerializer, Task.objects.all),
+            ("users", UserListSerializer, UserListValuesSerializer, CustomUser.objects.all),
+            ("contacts", ContactSerializer, ContactValuesSerializer, user.contacts.all),
+        ]
+        renderer = JSONRenderer()
+        rows = []
+
+        for name, model_serializer, values_serializer, queryset in cases:
+            def run_model():
+                qs = queryset()
+                if hasattr(model_serializer, "setup_eager_loading"):
+                    qs = model_serializer.setup_eager_loading(qs)
+                return renderer.render(model_serializer(qs, many=True).data)
+
+            def run_values():
+                return renderer.render(values_serializer(queryset(), many=True).data)
+
+            identical = run_model() == run_values()
+            model_stats = summarize(measure(run_model, args.repeat))
+            values_stats = summarize(measure(run_values, args.repeat))
+            rows.append(
+                (
+                    name,
+                    f"{model_stats['p50']:.1f}",
+                    f"{values_stats['p50']:.1f}",
+                    f"{model_stats['p50'] / values_stats['p50']:.1f}x",
+                    "yes" if identical else "NO",
+                )
+            )
+
+        print_table(
+            ["endpoint", "model p50 ms", "values p50 ms", "speedup", "identical"],
+            rows,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Every benchmark runs against a throw-away test database (in-memory for
+SQLite), so the project's db.sqlite3 is never touched.
+"""
+
+import datetime
+import os
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "join_backend.settings")
+# Without SQLITE_PATH the settings keep the rollback journal of the checked
+# in db.sqlite3; the throw-away databases are measured like a deployment.
+os.environ.setdefault("SQLITE_JOURNAL_MODE", "WAL")
+
+import django
+
+django.setup()
+
+from django.db import connection
+from django.test.utils import setup_test_environment
+
+
+@contextmanager
+def test_database(path=None):
+    """
+    Create a throw-away test database. SQLite test databases are in memory
+    unless `path` is given, which concurrent clients need: each thread gets
+    its own connection.
+    """
+    setup_test_environment()
+    if path is not None and connection.vendor == "sqlite":
+        connection.settings_dict["TEST"]["NAME"] = str(path)
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def seed_board(
+    users=10, tasks=1000, contacts=100, assignees=3, categories=1, subtasks=2, seed=0
+):
+    """
+    Bulk create a synthetic board with `manage.py seed_join`'s generator and
+    return its first user, who owns all the contacts.
+    """
+    from join.models import CustomUser
+    from join.seed import BoardSeeder
+
+    user_ids = BoardSeeder(seed=seed, start_date=datetime.date.today()).seed(
+        users=users,
+        tasks=tasks,
+        contacts=contacts,
+        categories=categories,
+        assignees=assignees,
+        subtasks=subtasks,
+        contact_owners=1,
+    )
+    return CustomUser.objects.get(pk=user_ids[0])
+
+
+class QueryCounter:
+    """
+    Counts the queries run on the default connection, across requests
+    (CaptureQueriesContext is reset by every request_started signal).
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def count_queries(func):
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter):
+        func()
+    return counter.count
+
+
+def measure(func, repeat=20):
+    """
+    Call `func` `repeat` times and return the wall clock durations in ms.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def summarize(timings):
+    return {
+        "mean": statistics.mean(timings),
+        "p50": percentile(timings, 50),
+        "p95": percentile(timings, 95),
+    }
+
+
+def print_table(headers, rows):
+    widths = [
+        max(len(str(header)), *(len(str(row[i])) for row in rows))
+        for i, header in enumerate(headers)
+    ]
+    print("  ".join(str(h).ljust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(str(c).ljust(w) for c, w in zip(row, widths)))
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Task, Category, Subtask, CustomUser, Contact
+from .etags import TASKS, bump_version
+from .models import Task, Category, Subtask, CustomUser, Contact, OutboxEmail
 
 # Register your models here.
 
@@ -10,14 +11,42 @@ class Task_Admin(admin.ModelAdmin):
     list_display_links = ("id", "title")
 
 
+class Subtask_Admin(admin.ModelAdmin):
+    list_display = ("id", "title", "task", "complete")
+    list_display_links = ("id", "title")
+
+    def refresh_counters(self, task_ids):
+        Task.objects.filter(pk__in=task_ids).refresh_subtask_counters()
+        bump_version(TASKS)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        self.refresh_counters([obj.task_id])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        self.refresh_counters([obj.task_id])
+
+    def delete_queryset(self, request, queryset):
+        task_ids = list(queryset.values_list("task_id", flat=True))
+        super().delete_queryset(request, queryset)
+        self.refresh_counters(task_ids)
+
+
 class Category_Admin(admin.ModelAdmin):
     list_display = ("id", "name", "color")
     list_filter = ("id",)
     list_display_links = ("id", "name", "color")
 
 
+class OutboxEmail_Admin(admin.ModelAdmin):
+    list_display = ("id", "subject", "to", "status", "attempts", "created_at")
+    list_filter = ("status",)
+
+
 admin.site.register(Task, Task_Admin)
 admin.site.register(Category, Category_Admin)
-admin.site.register(Subtask)
+admin.site.register(Subtask, Subtask_Admin)
 admin.site.register(CustomUser)
 admin.site.register(Contact)
+admin.site.register(OutboxEmail, OutboxEmail_Admin)
@@ -0,0 +1,113 @@
+import datetime
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from join_backend.serializers import TaskValuesSerializer
+
+from .etags import ARCHIVE, bump_version
+from .events import TASK_ARCHIVED, publish_task_event
+from .models import ArchivedTask, Task
+from .summary import DONE
+from .tokens import delete_in_batches
+
+
+def get_archive_settings():
+    defaults = {"AGE_DAYS": 90, "BATCH_SIZE": 500, "DATABASE": "default"}
+    return {**defaults, **getattr(settings, "JOIN_TASK_ARCHIVE", {})}
+
+
+def get_archive_database():
+    return get_archive_settings()["DATABASE"]
+
+
+class ArchiveRouter:
+    """
+    Keeps the task archive in the JOIN_TASK_ARCHIVE["DATABASE"] database
+    and everything else out of it. With the default database it routes
+    nothing.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model is ArchivedTask:
+            return get_archive_database()
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        database = get_archive_database()
+
+        if app_label == "join" and model_name == "archivedtask":
+            return db == database
+        if database != "default" and db == database:
+            return False
+        return None
+
+
+def archivable_tasks(now=None):
+    """
+    The done tasks not changed for JOIN_TASK_ARCHIVE["AGE_DAYS"] days, none
+    if AGE_DAYS is None.
+    """
+    age_days = get_archive_settings()["AGE_DAYS"]
+    if age_days is None:
+        return Task.objects.none()
+
+    cutoff = (now or timezone.now()) - datetime.timedelta(days=age_days)
+    return Task.objects.filter(status=DONE, updated_at__lt=cutoff)
+
+
+def archive_task_data(task):
+    return ArchivedTask(
+        id=task["id"],
+        title=task["title"],
+        priority=task["priority"],
+        category_id=task["category"],
+        author_id=task["author"],
+        due_date=task["due_date"],
+        completed_at=task["updated_at"],
+        data=task,
+    )
+
+
+def archive_tasks(batch_size=None, pause=0, now=None):
+    """
+    Move the archivable tasks to the archive, `batch_size` at a time, and
+    return how many there were.
+
+    Each batch is committed to the archive before it is deleted from the
+    board. With the archive in the default database both happen in one
+    transaction; in a separate database a batch interrupted in between is
+    still on the board and archived again (ignoring the rows already there)
+    by the next run.
+    """
+    tasks = archivable_tasks(now)
+    database = get_archive_database()
+
+    def select_batch(size):
+        # A range scan of the (status, updated_at) index.
+        return list(tasks.order_by("updated_at").values_list("id", flat=True)[:size])
+
+    def move_batch(ids):
+        # The inner block, the archive, commits first.
+        with transaction.atomic(), transaction.atomic(using=database):
+            # Tasks reopened since the batch was selected stay on the board.
+            batch = TaskValuesSerializer.setup_eager_loading(tasks.filter(pk__in=ids))
+            data = TaskValuesSerializer(batch, many=True).data
+
+            ArchivedTask.objects.using(database).bulk_create(
+                [archive_task_data(task) for task in data], ignore_conflicts=True
+            )
+            # Through the ORM, so delta syncs get tombstones (see signals).
+            Task.objects.filter(pk__in=[task["id"] for task in data]).delete()
+            bump_version(ARCHIVE)
+
+            for task in data:
+                publish_task_event(TASK_ARCHIVED, task_id=task["id"])
+
+        return len(data)
+
+    batch_size = batch_size or get_archive_settings()["BATCH_SIZE"]
+    return delete_in_batches(select_batch, move_batch, batch_size, pause)
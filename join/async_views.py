@@ -0,0 +1,126 @@
+import asyncio
+import functools
+
+from asgiref.sync import sync_to_async
+from rest_framework import exceptions
+from rest_framework.views import APIView
+
+
+def in_event_loop():
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class DualModeView:
+    """
+    View function that is a coroutine function when Django calls it from the
+    event loop (ASGI) and a plain function otherwise (WSGI, the test client).
+
+    Django (< 4.1) checks `asyncio.iscoroutinefunction(view)` for every
+    request right before calling the view, which looks at `_is_coroutine`.
+    """
+
+    def __init__(self, view):
+        functools.update_wrapper(self, view)
+        self.view = view
+
+    @property
+    def _is_coroutine(self):
+        return asyncio.coroutines._is_coroutine if in_event_loop() else None
+
+    def __call__(self, request, *args, **kwargs):
+        return self.view(request, *args, **kwargs)
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView that is dispatched natively on the event loop under ASGI.
+
+    Under WSGI and with the sync test client it is a plain APIView: the
+    regular handlers (`get`, `post`, ...) run, without any event loop.
+    Under ASGI authentication uses the authenticators' `aauthenticate` when
+    they have one (see CachedTokenAuthentication), then the handler runs:
+    an `a<method>` coroutine (`aget`, ...) if the view has one, else the
+    regular handler in a thread.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Django only recognises async class-based views from 4.1 on.
+        return DualModeView(super().as_view(**initkwargs))
+
+    def dispatch(self, request, *args, **kwargs):
+        if in_event_loop():
+            return self.adispatch(request, *args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            response = await self.get_async_handler(request)(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    def get_async_handler(self, request):
+        method = request.method.lower()
+
+        if method not in self.http_method_names:
+            return sync_to_async(self.http_method_not_allowed)
+
+        handler = getattr(self, "a" + method, None)
+        if handler is not None:
+            return handler
+
+        handler = getattr(self, method, self.http_method_not_allowed)
+        return sync_to_async(handler)
+
+    async def ainitial(self, request, *args, **kwargs):
+        """
+        `APIView.initial` with authentication awaited up front instead of
+        run lazily on the first access to `request.user`.
+        """
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.aperform_authentication(request)
+        self.check_permissions(request)
+        self.check_throttles(request)
+
+    async def aperform_authentication(self, request):
+        for authenticator in request.authenticators:
+            authenticate = getattr(authenticator, "aauthenticate", None)
+
+            try:
+                if authenticate is not None:
+                    user_auth_tuple = await authenticate(request)
+                else:
+                    user_auth_tuple = await sync_to_async(
+                        authenticator.authenticate
+                    )(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+
+            if user_auth_tuple is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth_tuple
+                return
+
+        request._not_authenticated()
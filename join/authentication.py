@@ -0,0 +1,256 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.utils import timezone
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from .tokens import (
+    expired_token_filter,
+    get_cutoff,
+    is_expired,
+    start_session,
+    touch_due,
+    touch_token,
+)
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU cache whose entries expire after `ttl` seconds.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None:
+                return None
+
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def get_cache_settings():
+    defaults = {"TTL": 30, "MAX_SIZE": 10000, "CACHE_ALIAS": None}
+    return {**defaults, **getattr(settings, "JOIN_TOKEN_CACHE", {})}
+
+
+_settings = get_cache_settings()
+local_cache = TTLCache(_settings["MAX_SIZE"], _settings["TTL"])
+
+
+def get_shared_cache():
+    alias = get_cache_settings()["CACHE_ALIAS"]
+    return caches[alias] if alias else None
+
+
+def shared_cache_key(key):
+    # Token keys are credentials, only their hash goes to the shared cache.
+    return "join:token:" + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_token(key):
+    local_cache.delete(key)
+
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        shared_cache.delete(shared_cache_key(key))
+
+
+def invalidate_user_tokens(user):
+    for key in Token.objects.filter(user=user).values_list("key", flat=True):
+        invalidate_token(key)
+
+
+def get_or_create_token(user):
+    """
+    Return the user's token key and restart its expiry window. An expired
+    token is replaced by a new one rather than revived by the login.
+    """
+    cutoff = get_cutoff()
+    if cutoff is not None:
+        Token.objects.filter(expired_token_filter(cutoff), user=user).delete()
+
+    key = upsert_token(user)
+    start_session(key)
+    return key
+
+
+def upsert_token(user):
+    """
+    Return the user's token key, creating the token if needed, with a single
+    `INSERT ... ON CONFLICT ... RETURNING` on SQLite 3.35+ and PostgreSQL.
+    """
+    if connection.vendor == "sqlite":
+        supported = connection.Database.sqlite_version_info >= (3, 35)
+    else:
+        supported = connection.vendor == "postgresql"
+
+    if not supported:
+        token, _ = Token.objects.get_or_create(user=user)
+        return token.key
+
+    table, key, user_id, created_column = map(
+        connection.ops.quote_name, [Token._meta.db_table, "key", "user_id", "created"]
+    )
+    created = connection.ops.adapt_datetimefield_value(timezone.now())
+
+    with connection.cursor() as cursor:
+        # The no-op update makes RETURNING yield the existing key on conflict.
+        cursor.execute(
+            f"INSERT INTO {table} ({key}, {user_id}, {created_column}) "
+            f"VALUES (%s, %s, %s) ON CONFLICT ({user_id}) "
+            f"DO UPDATE SET {user_id} = EXCLUDED.{user_id} RETURNING {key}",
+            [Token.generate_key(), user.pk, created],
+        )
+        return cursor.fetchone()[0]
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that remembers authenticated tokens for a short TTL
+    in a bounded in-process cache, optionally backed by a shared Django
+    cache (`JOIN_TOKEN_CACHE["CACHE_ALIAS"]`), so most requests skip the
+    Token/CustomUser query.
+
+    Entries are dropped when the token is deleted (logout, user deletion) or
+    the user is saved or resets the password. With a shared cache it is the
+    only one consulted, so that applies to all processes at once; the
+    in-process cache is used without one, its entries are not seen by other
+    processes and expire after the TTL.
+
+    Tokens expire after JOIN_TOKEN_EXPIRY["IDLE_TIMEOUT"] seconds without
+    use. Every use slides the window, but `last_seen` is written at most
+    once per `TOUCH_INTERVAL`, so reads do not turn into writes.
+
+    Async views call `aauthenticate`, which answers from the in-process
+    cache without leaving the event loop when no shared cache is set.
+    """
+
+    async def aauthenticate(self, request):
+        auth = get_authorization_header(request).split()
+        keyword = self.keyword.lower().encode()
+
+        # A shared cache is read in a thread like the database.
+        local = get_shared_cache() is None
+
+        if local and len(auth) == 2 and auth[0].lower() == keyword:
+            try:
+                cached = local_cache.get(auth[1].decode())
+            except UnicodeError:
+                cached = None
+
+            if cached is not None:
+                user, token = cached
+                now = timezone.now()
+
+                if not is_expired(token, now) and not touch_due(token, now):
+                    return copy.copy(user), token
+
+        # Misses, writes and malformed headers take the regular path in a
+        # thread.
+        return await sync_to_async(self.authenticate)(request)
+
+    def authenticate_credentials(self, key):
+        now = timezone.now()
+        user, token = self.get_credentials(key)
+
+        if is_expired(token, now):
+            # Another process may have used the token since it was cached.
+            invalidate_token(key)
+            user, token = self.get_credentials(key)
+
+            if is_expired(token, now):
+                token.delete()
+                raise AuthenticationFailed("Token has expired.")
+
+        if touch_due(token, now):
+            touch_token(token, now)
+
+            shared_cache = get_shared_cache()
+            if shared_cache is not None:
+                # The entry is a copy, store the new `last_seen` with it.
+                self.remember_credentials(shared_cache, key, (user, token))
+
+        # Each request gets its own user instance, the cached one is shared.
+        return copy.copy(user), token
+
+    def get_credentials(self, key):
+        shared_cache = get_shared_cache()
+
+        if shared_cache is not None:
+            # Checked on every request: a token invalidated by another
+            # process must not live on in a local copy here.
+            cached = shared_cache.get(shared_cache_key(key))
+
+            if cached is None:
+                cached = self.load_credentials(key)
+                self.remember_credentials(shared_cache, key, cached)
+
+            return cached
+
+        cached = local_cache.get(key)
+
+        if cached is None:
+            cached = self.load_credentials(key)
+            local_cache.set(key, cached)
+
+        return cached
+
+    def remember_credentials(self, shared_cache, key, credentials):
+        shared_cache.set(
+            shared_cache_key(key), credentials, get_cache_settings()["TTL"]
+        )
+
+    def load_credentials(self, key):
+        """
+        TokenAuthentication's lookup, with the token's activity in the same
+        query.
+        """
+        try:
+            token = Token.objects.select_related("user", "activity").get(key=key)
+        except Token.DoesNotExist:
+            raise AuthenticationFailed("Invalid token.")
+
+        if not token.user.is_active:
+            raise AuthenticationFailed("User inactive or deleted.")
+
+        activity = getattr(token, "activity", None)
+        token.last_seen = activity.last_seen if activity is not None else None
+        return token.user, token
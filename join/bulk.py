@@ -0,0 +1,296 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+
+from join_backend.serializers import TaskBulkSerializer, TaskValuesSerializer
+
+from .catalogue import get_catalogue
+from .etags import TASKS, bump_version, parse_version
+from .filters import is_valid_id
+from .events import TASK_CREATED, TASK_DELETED, TASK_UPDATED, publish_task_event
+from .models import Category, CustomUser, Task
+from .subtasks import replace_subtasks
+
+MAX_ITEMS = 500
+CONFLICT_ERROR = "The task was changed by someone else."
+
+
+def is_id(value):
+    # JSON true and false arrive as bool, a subclass of int.
+    return type(value) is int and is_valid_id(value)
+
+
+class TaskBulkOperation:
+    """
+    Validates and applies a batch of task creates, partial updates and
+    deletes in one transaction.
+
+    Every item is validated first; if any item fails nothing is written and
+    the per-item results carry the errors. Creates and updates are written
+    with `bulk_create`/`bulk_update` and assignees with set-based writes on
+    the through table, which bypass model signals, so the ETag version,
+    `updated_at`, subtask counters and events are handled here. Deletes go
+    through the ORM so their tombstones are recorded as usual.
+
+    Updates write only the fields that changed and bump the task versions.
+    An item with `version` fails with 412 if the task is at another version.
+    Callers run `validate` and `execute` in one transaction, the updated
+    tasks are locked from the moment they are loaded.
+    """
+
+    def __init__(self, user, data):
+        self.user = user
+        self.creates = data.get("create", [])
+        self.updates = data.get("update", [])
+        self.deletes = data.get("delete", [])
+        self.results = {"created": [], "updated": [], "deleted": []}
+        self.valid = True
+
+    def get_payload_errors(self):
+        for name in ("create", "update", "delete"):
+            items = getattr(self, name + "s")
+            if not isinstance(items, list):
+                return {name: "Must be a list."}
+            if len(items) > MAX_ITEMS:
+                return {name: f"At most {MAX_ITEMS} items per request."}
+
+        if not all(is_id(pk) for pk in self.deletes):
+            return {"delete": "Must be a list of task ids."}
+
+        if not all(isinstance(item, dict) for item in self.creates + self.updates):
+            return {"non_field_errors": "Items must be objects."}
+
+        # Every task may appear once: the items are validated against the
+        # same loaded task and the results are keyed by id.
+        update_ids = [item["id"] for item in self.updates if is_id(item.get("id"))]
+        for name, ids in (("update", update_ids), ("delete", self.deletes)):
+            if len(set(ids)) != len(ids):
+                return {name: "Task ids must be unique."}
+
+        if set(update_ids) & set(self.deletes):
+            return {"non_field_errors": "A task cannot be updated and deleted."}
+
+        return None
+
+    def fail(self, result, code, errors):
+        self.valid = False
+        result.update({"status": code, "errors": errors})
+
+    def get_assigned_user_ids(self, item, result):
+        ids = item.get("assigned_users")
+
+        if ids is None:
+            return None
+
+        if not isinstance(ids, list) or not all(is_id(pk) for pk in ids):
+            self.fail(
+                result,
+                status.HTTP_400_BAD_REQUEST,
+                {"assigned_users": "Must be a list of user ids."},
+            )
+            return None
+
+        return ids
+
+    def validate(self):
+        now = timezone.now()
+        self.new_tasks, self.new_assignees, self.new_subtasks = [], [], []
+        self.changed_tasks, self.changed_fields = [], set()
+        self.changed_assignees, self.changed_subtasks = {}, {}
+
+        for index, item in enumerate(self.creates):
+            result = {"index": index}
+            self.results["created"].append(result)
+            serializer = TaskBulkSerializer(data=item)
+            assigned = self.get_assigned_user_ids(item, result)
+
+            if not serializer.is_valid():
+                self.fail(result, status.HTTP_400_BAD_REQUEST, serializer.errors)
+            elif "category_id" not in serializer.validated_data:
+                self.fail(
+                    result,
+                    status.HTTP_400_BAD_REQUEST,
+                    {"category": "This field is required."},
+                )
+            else:
+                subtasks = serializer.validated_data.pop("subtask_set", None)
+                task = Task(**serializer.validated_data, author=self.user)
+                self.new_tasks.append((result, task))
+                self.new_assignees.append(assigned or [])
+                self.new_subtasks.append(subtasks)
+
+        update_ids = [item.get("id") for item in self.updates]
+        instances = Task.objects.select_for_update().in_bulk(
+            [pk for pk in update_ids if is_id(pk)]
+        )
+
+        for pk, item in zip(update_ids, self.updates):
+            result = {"id": pk}
+            self.results["updated"].append(result)
+            task = instances.get(pk) if is_id(pk) else None
+
+            if task is None:
+                self.fail(result, status.HTTP_404_NOT_FOUND, {"id": "Task not found."})
+                continue
+
+            data = {key: value for key, value in item.items() if key != "id"}
+            serializer = TaskBulkSerializer(instance=task, data=data, partial=True)
+            assigned = self.get_assigned_user_ids(item, result)
+
+            if not serializer.is_valid():
+                self.fail(result, status.HTTP_400_BAD_REQUEST, serializer.errors)
+                continue
+
+            version = item.get("version")
+            if version is not None:
+                version = parse_version(version)
+                if version is None:
+                    self.fail(
+                        result,
+                        status.HTTP_400_BAD_REQUEST,
+                        {"version": "Must be an integer."},
+                    )
+                    continue
+                if version != task.version:
+                    self.fail(
+                        result,
+                        status.HTTP_412_PRECONDITION_FAILED,
+                        {"version": CONFLICT_ERROR},
+                    )
+                    continue
+
+            subtasks = serializer.validated_data.pop("subtask_set", None)
+            if subtasks is not None:
+                self.changed_subtasks[task.pk] = subtasks
+
+            fields = task.apply_changes(serializer.validated_data)
+            if fields:
+                # Like a single PATCH, a no-op keeps the version.
+                self.changed_fields.update(fields)
+                task.version += 1
+                task.updated_at = now
+            self.changed_tasks.append((result, task))
+            if assigned is not None:
+                self.changed_assignees[task.pk] = assigned
+
+        existing = set(
+            Task.objects.filter(pk__in=self.deletes).values_list("pk", flat=True)
+        )
+        for pk in self.deletes:
+            result = {"id": pk}
+            self.results["deleted"].append(result)
+            if pk not in existing:
+                self.fail(result, status.HTTP_404_NOT_FOUND, {"id": "Task not found."})
+
+        self.validate_categories()
+        return self.valid
+
+    def validate_categories(self):
+        tasks = self.new_tasks + self.changed_tasks
+        catalogue = get_catalogue()
+        existing = {
+            task.category_id for _, task in tasks if catalogue.get(task.category_id)
+        }
+        unknown = {task.category_id for _, task in tasks} - existing
+
+        if unknown:
+            # Categories created since the catalogue was loaded.
+            existing |= set(
+                Category.objects.filter(pk__in=unknown).values_list("pk", flat=True)
+            )
+
+        for result, task in tasks:
+            if task.category_id not in existing:
+                self.fail(
+                    result,
+                    status.HTTP_404_NOT_FOUND,
+                    {"category": "Category not found."},
+                )
+
+    def set_assignees(self, assignees):
+        """
+        Replace the assignees of the given tasks with two set-based queries,
+        ignoring unknown user ids like TaskView.post does.
+        """
+        if not assignees:
+            return
+
+        through = Task.assigned_users.through
+        user_ids = {pk for ids in assignees.values() for pk in ids}
+        existing = set(
+            CustomUser.objects.filter(pk__in=user_ids).values_list("pk", flat=True)
+        )
+
+        through.objects.filter(task_id__in=assignees).delete()
+        through.objects.bulk_create(
+            through(task_id=task_id, customuser_id=user_id)
+            for task_id, ids in assignees.items()
+            for user_id in dict.fromkeys(ids)
+            if user_id in existing
+        )
+
+    def get_error_status(self):
+        """
+        412 if every failed item is a conflict, else 400.
+        """
+        codes = {
+            result["status"]
+            for results in self.results.values()
+            for result in results
+            if "errors" in result
+        }
+        if codes == {status.HTTP_412_PRECONDITION_FAILED}:
+            return status.HTTP_412_PRECONDITION_FAILED
+        return status.HTTP_400_BAD_REQUEST
+
+    def execute(self):
+        with transaction.atomic():
+            created = Task.objects.bulk_create([task for _, task in self.new_tasks])
+
+            if self.changed_tasks:
+                Task.objects.bulk_update(
+                    [task for _, task in self.changed_tasks],
+                    sorted(self.changed_fields | {"updated_at", "version"}),
+                )
+
+            assignees = {
+                task.pk: ids for task, ids in zip(created, self.new_assignees) if ids
+            }
+            self.set_assignees({**assignees, **self.changed_assignees})
+
+            subtasks = {
+                task.pk: items
+                for task, items in zip(created, self.new_subtasks)
+                if items is not None
+            }
+            replace_subtasks({**subtasks, **self.changed_subtasks})
+
+            if self.deletes:
+                Task.objects.filter(pk__in=self.deletes).delete()
+
+            bump_version(TASKS)
+
+            written = [task.pk for task in created]
+            written += [task.pk for _, task in self.changed_tasks]
+            data = {
+                task["id"]: task
+                for task in TaskValuesSerializer(
+                    Task.objects.filter(pk__in=written)
+                ).data
+            }
+
+            for result, task in self.new_tasks:
+                result["status"] = status.HTTP_201_CREATED
+                result["task"] = data[task.pk]
+                publish_task_event(TASK_CREATED, task=data[task.pk])
+
+            for result, task in self.changed_tasks:
+                result["status"] = status.HTTP_200_OK
+                result["task"] = data[task.pk]
+                publish_task_event(TASK_UPDATED, task=data[task.pk])
+
+            for result in self.results["deleted"]:
+                result["status"] = status.HTTP_204_NO_CONTENT
+                publish_task_event(TASK_DELETED, task_id=result["id"])
+
+        return self.results
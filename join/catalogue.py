@@ -0,0 +1,160 @@
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from .etags import CATEGORIES, get_versions
+from .models import Category
+
+VERSION_KEY = "join:categories:version"
+DATA_KEY = "join:categories"
+
+
+def get_catalogue_settings():
+    defaults = {"TTL": 60, "CACHE_ALIAS": None}
+    return {**defaults, **getattr(settings, "JOIN_CATEGORY_CACHE", {})}
+
+
+def get_shared_cache():
+    alias = get_catalogue_settings()["CACHE_ALIAS"]
+    return caches[alias] if alias else None
+
+
+class CategoryCatalogue:
+    """
+    Snapshot of the whole Category table with the CATEGORIES version it was
+    read at: the instances by id and the list as CategorySerializer renders
+    it.
+    """
+
+    def __init__(self, version, categories):
+        from join_backend.serializers import CategorySerializer
+
+        self.version = version
+        self.by_id = {category.pk: category for category in categories}
+        # Plain dicts, the catalogue is pickled into the shared cache.
+        data = CategorySerializer(categories, many=True).data
+        self.data = [dict(item) for item in data]
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def load(cls):
+        (version,) = get_versions(CATEGORIES)
+        return cls(version, list(Category.objects.order_by("id")))
+
+    def get(self, pk):
+        return self.by_id.get(pk)
+
+
+_local = None
+
+
+def get_catalogue():
+    """
+    Return the category catalogue, reading the database only when no process
+    has a current copy.
+
+    Each process keeps the catalogue in memory for JOIN_CATEGORY_CACHE["TTL"]
+    seconds and drops it as soon as a category is written in it. With a
+    shared cache (`CACHE_ALIAS`) the current version is looked up there on
+    every call instead, so writes in other processes take effect at once,
+    and a new catalogue is read from the database by one process only.
+    """
+    global _local
+
+    config = get_catalogue_settings()
+    shared_cache = get_shared_cache()
+    local = _local
+
+    if shared_cache is None:
+        _local = get_fresh_local() or CategoryCatalogue.load()
+        return _local
+
+    version = shared_cache.get(VERSION_KEY)
+    if local is not None and local.version == version:
+        return local
+
+    catalogue = None
+    if version is not None:
+        catalogue = shared_cache.get(f"{DATA_KEY}:{version}")
+
+    if catalogue is None:
+        catalogue = CategoryCatalogue.load()
+        shared_cache.set(f"{DATA_KEY}:{catalogue.version}", catalogue, config["TTL"])
+        publish_version(shared_cache, catalogue.version, config["TTL"])
+
+    _local = catalogue
+    return catalogue
+
+
+def publish_version(shared_cache, version, ttl):
+    """
+    Make `version` the current one in the shared cache, unless a category
+    was written since it was read: a write committed while this process was
+    loading the catalogue may already have deleted the key, setting it now
+    would bring the old version back for every process.
+    """
+    if not shared_cache.add(VERSION_KEY, version, ttl):
+        return
+
+    (current,) = get_versions(CATEGORIES)
+    if current != version:
+        shared_cache.delete(VERSION_KEY)
+
+
+def get_fresh_local():
+    """
+    The in-process catalogue if it can be used without any I/O: there is no
+    shared cache to check and it is younger than the TTL.
+    """
+    local = _local
+
+    if get_shared_cache() is not None or local is None:
+        return None
+
+    if time.monotonic() - local.loaded_at >= get_catalogue_settings()["TTL"]:
+        return None
+
+    return local
+
+
+async def aget_catalogue():
+    """
+    `get_catalogue` for async views, only going to a thread when the
+    catalogue has to be read from a cache or the database.
+    """
+    return get_fresh_local() or await sync_to_async(get_catalogue)()
+
+
+def get_category(pk):
+    """
+    Look a category up in the catalogue, falling back to the database for
+    ids the catalogue does not know yet. Returns None if there is no such
+    category.
+    """
+    category = get_catalogue().get(pk)
+
+    if category is None:
+        category = Category.objects.filter(pk=pk).first()
+
+    return category
+
+
+def invalidate_catalogue():
+    global _local
+    _local = None
+
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        shared_cache.delete(VERSION_KEY)
+
+
+def category_written():
+    """
+    Drop the catalogue now and again once the transaction has committed, so
+    no request keeps a copy read before the commit.
+    """
+    invalidate_catalogue()
+    transaction.on_commit(invalidate_catalogue)
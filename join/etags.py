@@ -0,0 +1,143 @@
+import hashlib
+
+from django.db.models import F
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.serializers import ValidationError
+
+from .models import TableVersion
+
+TASKS = "tasks"
+CATEGORIES = "categories"
+USERS = "users"
+ARCHIVE = "archive"
+
+
+def contacts_scope(user_id):
+    return f"contacts:{user_id}"
+
+
+def get_versions(*names):
+    """
+    Return the current version of each scope, in one query.
+    """
+    versions = dict(
+        TableVersion.objects.filter(name__in=names).values_list("name", "version")
+    )
+    return [versions.get(name, 0) for name in names]
+
+
+def bump_version(*names):
+    """
+    Mark scopes as changed. Model signals call this for regular saves and
+    deletes; code writing with `bulk_create`, `bulk_update` or
+    `QuerySet.update` has to call it itself.
+    """
+    for name in names:
+        updated = TableVersion.objects.filter(name=name).update(
+            version=F("version") + 1
+        )
+
+        if not updated:
+            _, created = TableVersion.objects.get_or_create(
+                name=name, defaults={"version": 1}
+            )
+            if not created:
+                TableVersion.objects.filter(name=name).update(
+                    version=F("version") + 1
+                )
+
+
+def make_etag(request, *names, versions=None):
+    """
+    Build a strong ETag from the scope versions, the user and the full path,
+    so different filters or pages never share a tag. Callers that already
+    know the versions can pass them to skip the query.
+    """
+    if versions is None:
+        versions = get_versions(*names)
+    key = "|".join(
+        [request.get_full_path(), str(request.user.pk)]
+        + [f"{name}={version}" for name, version in zip(names, versions)]
+    )
+    return '"{}"'.format(hashlib.sha1(key.encode()).hexdigest())
+
+
+def etag_matches(request, etag):
+    header = request.headers.get("If-None-Match")
+
+    if not header:
+        return False
+
+    # If-None-Match uses weak comparison, compressed responses carry W/ tags.
+    candidates = [tag.strip() for tag in header.split(",")]
+    candidates = [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag):
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response["ETag"] = etag
+    return response
+
+
+def version_etag(version):
+    """
+    The ETag of a single task, its row version.
+    """
+    return f'"{version}"'
+
+
+def parse_version(value):
+    """
+    A task version sent in a body as an integer, or as a string of digits
+    by form-encoded bodies. None if it is neither.
+    """
+    if isinstance(value, str) and value.isascii() and value.isdigit():
+        return int(value)
+    if not isinstance(value, int) or isinstance(value, bool):
+        return None
+    return value
+
+
+def get_expected_versions(request):
+    """
+    The task versions a write is conditional on: the tags of `If-Match`, or
+    else the `version` field of the body. None if the write is
+    unconditional, an empty set if no tag can match.
+    """
+    header = request.headers.get("If-Match")
+
+    if header is None:
+        version = request.data.get("version") if hasattr(request.data, "get") else None
+        if version is None:
+            return None
+        version = parse_version(version)
+        if version is None:
+            raise ValidationError({"version": "Must be an integer."})
+        return {version}
+
+    versions = set()
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return None
+        # Compressed responses carry W/ tags, the version is the same.
+        tag = tag[2:] if tag.startswith("W/") else tag
+        if tag.startswith('"') and tag.endswith('"') and tag[1:-1].isdigit():
+            versions.add(int(tag[1:-1]))
+
+    return versions
+
+
+def precondition_failed(data, version):
+    """
+    412 for a write based on an outdated version, with the current state so
+    the client can merge and retry.
+    """
+    response = Response(
+        {"error": "The task was changed by someone else.", "task": data},
+        status=status.HTTP_412_PRECONDITION_FAILED,
+    )
+    response["ETag"] = version_etag(version)
+    return response
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+TASK_CREATED = "task.created"
+TASK_UPDATED = "task.updated"
+TASK_DELETED = "task.deleted"
+TASK_ARCHIVED = "task.archived"
+
+
+class Subscription:
+    """
+    A subscriber's event queue, bound to the event loop that reads it.
+    """
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A client this far behind has to resync through `tasks/?since=`.
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class InProcessBroker:
+    """
+    Pub/sub backend that fans events out to the subscribers of this process.
+
+    `publish` is safe to call from the synchronous views, `subscribe` must be
+    called from the event loop that consumes the events. Deployments running
+    several processes need a broker shared between them; any class with the
+    same three methods can be configured as `JOIN_EVENTS_BROKER`.
+    """
+
+    queue_size = 100
+
+    def __init__(self):
+        self.subscriptions = set()
+        self.lock = threading.Lock()
+
+    def subscribe(self):
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+
+        with self.lock:
+            self.subscriptions.add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def publish(self, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions)
+
+        for subscription in subscriptions:
+            if not subscription.loop.is_closed():
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+
+    with _broker_lock:
+        if _broker is None:
+            path = getattr(settings, "JOIN_EVENTS_BROKER", "join.events.InProcessBroker")
+            _broker = import_string(path)()
+
+    return _broker
+
+
+def publish_task_event(event_type, task=None, task_id=None):
+    """
+    Broadcast a task event once the current transaction has committed, so
+    listeners never see a write that was rolled back.
+    """
+    event = {"type": event_type}
+
+    if task is not None:
+        event["task"] = task
+    if task_id is not None:
+        event["id"] = task_id
+
+    transaction.on_commit(lambda: get_broker().publish(event))
@@ -0,0 +1,139 @@
+import datetime
+
+from django.db.models import Q
+from rest_framework.serializers import ValidationError
+
+from .models import TaskAssignment
+from .search import fts_enabled, fts_matches
+
+
+# Bounds of the database's 64 bit integers, larger ids fail in the driver.
+MIN_ID, MAX_ID = -(2**63), 2**63 - 1
+
+
+def is_valid_id(value):
+    return MIN_ID <= value <= MAX_ID
+
+
+def split_param(params, name):
+    """
+    Return the comma separated values of a query parameter as a list.
+    """
+    value = params.get(name)
+
+    if not value:
+        return []
+
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def split_int_param(params, name):
+    try:
+        ids = [int(item) for item in split_param(params, name)]
+    except ValueError:
+        ids = None
+
+    if ids is None or not all(is_valid_id(pk) for pk in ids):
+        raise ValidationError({name: "Must be a comma separated list of ids."})
+
+    return ids
+
+
+def parse_date_param(params, name):
+    value = params.get(name)
+
+    if not value:
+        return None
+
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({name: "Must be a date in YYYY-MM-DD format."})
+
+
+def assigned_task_ids(user_ids):
+    """
+    The ids of the tasks assigned to any of the users, as a subquery on the
+    assignment table's (customuser, task) index. It avoids the duplicate
+    rows (and the DISTINCT) a join on the M2M would produce.
+    """
+    return TaskAssignment.objects.filter(customuser_id__in=user_ids).values("task_id")
+
+
+def filter_tasks(queryset, params, user=None):
+    """
+    Narrow a Task queryset by the board filters given in the query string.
+
+    Supported parameters:
+        status, priority: comma separated values.
+        category, assigned_users: comma separated ids.
+        assigned_to: `me` for the tasks assigned to `user`.
+        due_date_from, due_date_to: inclusive ISO dates.
+    """
+    statuses = split_param(params, "status")
+    if statuses:
+        queryset = queryset.filter(status__in=statuses)
+
+    user_ids = split_int_param(params, "assigned_users")
+    if user_ids:
+        queryset = queryset.filter(id__in=assigned_task_ids(user_ids))
+
+    assigned_to = params.get("assigned_to")
+    if assigned_to:
+        if assigned_to != "me" or user is None:
+            raise ValidationError({"assigned_to": "Must be `me`."})
+        queryset = queryset.filter(id__in=assigned_task_ids([user.pk]))
+
+    return filter_archived_tasks(queryset, params)
+
+
+def filter_archived_tasks(queryset, params):
+    """
+    Narrow a Task or ArchivedTask queryset by the filters both support.
+
+    Supported parameters:
+        priority: comma separated values.
+        category: comma separated ids.
+        due_date_from, due_date_to: inclusive ISO dates.
+    """
+    priorities = split_param(params, "priority")
+    if priorities:
+        queryset = queryset.filter(priority__in=priorities)
+
+    category_ids = split_int_param(params, "category")
+    if category_ids:
+        queryset = queryset.filter(category_id__in=category_ids)
+
+    due_date_from = parse_date_param(params, "due_date_from")
+    if due_date_from:
+        queryset = queryset.filter(due_date__gte=due_date_from)
+
+    due_date_to = parse_date_param(params, "due_date_to")
+    if due_date_to:
+        queryset = queryset.filter(due_date__lte=due_date_to)
+
+    return queryset
+
+
+def filter_contacts(queryset, params):
+    """
+    Narrow a Contact queryset by the `search` query parameter.
+
+    With the SQLite FTS5 index every word of the search matches the start of
+    a word in the name, e-mail or phone number. Without it the search is a
+    case-insensitive substring match on the same fields.
+    """
+    search = params.get("search", "").strip()
+
+    if not search:
+        return queryset
+
+    if fts_enabled():
+        matches = fts_matches(search)
+        return queryset.filter(id__in=matches) if matches else queryset.none()
+
+    return queryset.filter(
+        Q(name__icontains=search)
+        | Q(email__icontains=search)
+        | Q(phone__icontains=search)
+    )
@@ -0,0 +1,45 @@
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+def get_hashing_setting(name, default):
+    return getattr(settings, "PASSWORD_HASHING", {}).get(name, default)
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2 with the iteration count from PASSWORD_HASHING. Existing hashes
+    keep working and are rehashed on the next login when the count changes.
+    """
+
+    iterations = get_hashing_setting(
+        "PBKDF2_ITERATIONS", PBKDF2PasswordHasher.iterations
+    )
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 (needs argon2-cffi) with the costs from PASSWORD_HASHING.
+    """
+
+    time_cost = get_hashing_setting("ARGON2_TIME_COST", Argon2PasswordHasher.time_cost)
+    memory_cost = get_hashing_setting(
+        "ARGON2_MEMORY_COST", Argon2PasswordHasher.memory_cost
+    )
+    parallelism = get_hashing_setting(
+        "ARGON2_PARALLELISM", Argon2PasswordHasher.parallelism
+    )
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    scrypt with the work factor from PASSWORD_HASHING.
+    """
+
+    work_factor = get_hashing_setting(
+        "SCRYPT_WORK_FACTOR", ScryptPasswordHasher.work_factor
+    )
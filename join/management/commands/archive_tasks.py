@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from join.archive import archive_tasks
+
+
+class Command(BaseCommand):
+    help = "Move done tasks older than JOIN_TASK_ARCHIVE['AGE_DAYS'] to the archive."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to wait between batches, to leave room for other writers.",
+        )
+
+    def handle(self, *args, **options):
+        archived = archive_tasks(options["batch_size"], options["pause"])
+        self.stdout.write(f"Archived {archived} task(s).")
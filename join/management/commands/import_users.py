@@ -0,0 +1,119 @@
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from join.etags import USERS, bump_version
+from join.models import CustomUser
+
+
+def read_rows(path):
+    """
+    Read users from a CSV file with a header row or a JSON list of objects,
+    using the same field names as `create_user/`.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        if Path(path).suffix.lower() == ".json":
+            rows = json.load(file)
+        else:
+            rows = list(csv.DictReader(file))
+
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise CommandError("Expected a list of user objects.")
+
+    return rows
+
+
+def hash_passwords(passwords, workers):
+    # Hashing is CPU bound, separate processes sidestep the GIL.
+    if workers > 1 and len(passwords) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(make_password, passwords, chunksize=16))
+
+    return [make_password(password) for password in passwords]
+
+
+class Command(BaseCommand):
+    help = "Import users from a CSV or JSON file, skipping taken usernames and e-mails."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processes used to hash the passwords.",
+        )
+
+    def handle(self, *args, **options):
+        rows = read_rows(options["path"])
+        batch_size = options["batch_size"]
+        created = skipped = 0
+
+        for start in range(0, len(rows), batch_size):
+            batch = self.get_new_rows(rows[start : start + batch_size])
+            skipped += min(batch_size, len(rows) - start) - len(batch)
+
+            if not batch:
+                continue
+
+            passwords = hash_passwords(
+                [row.get("password") or None for row in batch], options["workers"]
+            )
+            users = [
+                CustomUser(
+                    username=row["username"],
+                    first_name=row.get("firstname") or "",
+                    last_name=row.get("lastname") or "",
+                    email=row.get("email") or "",
+                    password=password,
+                    initials=row.get("initials") or "",
+                    color=row.get("color") or "",
+                )
+                for row, password in zip(batch, passwords)
+            ]
+
+            with transaction.atomic():
+                CustomUser.objects.bulk_create(users)
+                bump_version(USERS)
+
+            created += len(users)
+
+        self.stdout.write(f"Created {created} user(s), skipped {skipped}.")
+
+    def get_new_rows(self, rows):
+        """
+        Drop rows without a username and rows whose username or e-mail is
+        already taken, checking the whole batch in one query.
+        """
+        rows = [row for row in rows if row.get("username")]
+        usernames = {row["username"] for row in rows}
+        emails = {row["email"] for row in rows if row.get("email")}
+
+        taken = list(
+            CustomUser.objects.filter(
+                Q(username__in=usernames) | Q(email__in=emails)
+            ).values_list("username", "email")
+        )
+        taken_usernames = {username for username, _ in taken}
+        taken_emails = {email for _, email in taken}
+
+        new_rows = []
+        for row in rows:
+            email = row.get("email")
+            if row["username"] in taken_usernames or (email and email in taken_emails):
+                continue
+
+            # Duplicates within the file are skipped as well.
+            taken_usernames.add(row["username"])
+            if email:
+                taken_emails.add(email)
+            new_rows.append(row)
+
+        return new_rows
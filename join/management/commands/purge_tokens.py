@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from join.tokens import purge_auth_tokens, purge_reset_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete expired auth tokens and password reset tokens in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to wait between batches, to leave room for other writers.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size, pause = options["batch_size"], options["pause"]
+
+        auth_tokens = purge_auth_tokens(batch_size, pause)
+        reset_tokens = purge_reset_tokens(batch_size, pause)
+
+        self.stdout.write(
+            f"Deleted {auth_tokens} expired auth token(s) and "
+            f"{reset_tokens} expired password reset token(s)."
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from join.sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    help = "Delete the tombstones of deleted tasks no delta sync needs any more."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to wait between batches, to leave room for other writers.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = purge_tombstones(options["batch_size"], options["pause"])
+        self.stdout.write(f"Deleted {deleted} tombstone(s).")
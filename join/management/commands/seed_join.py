@@ -0,0 +1,63 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from join.models import CustomUser
+from join.seed import BoardSeeder
+
+
+class Command(BaseCommand):
+    help = "Bulk generate a synthetic board (users, categories, contacts, tasks)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--tasks", type=int, default=10000)
+        parser.add_argument("--contacts", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=5)
+        parser.add_argument("--assignees", type=int, default=3)
+        parser.add_argument("--subtasks", type=int, default=2)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--start-date",
+            type=datetime.date.fromisoformat,
+            default=datetime.date(2025, 1, 1),
+            help="Due dates are spread around this date (YYYY-MM-DD).",
+        )
+        parser.add_argument(
+            "--prefix",
+            default="seed",
+            help="Usernames are <prefix>0, <prefix>1, ...",
+        )
+        parser.add_argument("--password", default="join-password")
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["categories"] < 1:
+            raise CommandError("At least one user and one category are needed.")
+
+        if CustomUser.objects.filter(username=f"{options['prefix']}0").exists():
+            raise CommandError(
+                f"Users named {options['prefix']}N exist already, pass another --prefix."
+            )
+
+        seeder = BoardSeeder(
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            start_date=options["start_date"],
+            progress=self.report if options["verbosity"] > 0 else None,
+        )
+        seeder.seed(
+            users=options["users"],
+            tasks=options["tasks"],
+            contacts=options["contacts"],
+            categories=options["categories"],
+            assignees=options["assignees"],
+            subtasks=options["subtasks"],
+            prefix=options["prefix"],
+            password=options["password"],
+        )
+
+    def report(self, label, done, total, seconds):
+        rate = done / seconds if seconds else 0
+        self.stdout.write(f"{label}: {done}/{total} ({seconds:.1f}s, {rate:.0f}/s)")
+        self.stdout.flush()
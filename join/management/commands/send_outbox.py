@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from join.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = "Deliver the e-mails waiting in the outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep running and poll the outbox every --interval seconds.",
+        )
+        parser.add_argument("--interval", type=float, default=10)
+
+    def handle(self, *args, **options):
+        while True:
+            sent = deliver_pending()
+            if sent or options["verbosity"] > 1:
+                self.stdout.write(f"Sent {sent} e-mail(s).")
+
+            if not options["loop"]:
+                return
+
+            time.sleep(options["interval"])
@@ -0,0 +1,156 @@
+import contextvars
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def get_metrics_settings():
+    defaults = {"ENABLED": True, "WINDOW": 1000}
+    return {**defaults, **getattr(settings, "JOIN_METRICS", {})}
+
+
+class QueryTimer:
+    """
+    Execute wrapper counting the queries of a request and their total time.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+current_timer = contextvars.ContextVar("join_query_timer", default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    """
+    Execute wrapper installed once on every connection (see signals) that
+    counts the query for the QueryTimer of the current request. Concurrent
+    ASGI requests share the connections of one thread, the context variable
+    keeps their numbers apart.
+    """
+    timer = current_timer.get()
+
+    if timer is None:
+        return execute(sql, params, many, context)
+
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_timer(connection):
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+class ViewStats:
+    """
+    Totals of one view and method, plus the latencies of the last `window`
+    requests for the rolling quantiles.
+    """
+
+    def __init__(self, window):
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.sql_duration = 0.0
+        self.response_bytes = 0
+
+    def add(self, duration, queries, sql_duration, response_bytes):
+        self.latencies.append(duration)
+        self.requests += 1
+        self.duration += duration
+        self.queries += queries
+        self.sql_duration += sql_duration
+        self.response_bytes += response_bytes
+
+    def quantiles(self):
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return {}
+
+        return {
+            quantile: ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+            for quantile in QUANTILES
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process store of the per-view request metrics, rendered
+    in the Prometheus text format. Every process keeps its own numbers.
+    """
+
+    def __init__(self, window=None):
+        self.window = window
+        self.stats = {}
+        self.lock = threading.Lock()
+
+    def record(self, view, method, duration, queries, sql_duration, response_bytes):
+        key = (view, method)
+
+        with self.lock:
+            stats = self.stats.get(key)
+            if stats is None:
+                window = self.window or get_metrics_settings()["WINDOW"]
+                stats = self.stats[key] = ViewStats(window)
+
+            stats.add(duration, queries, sql_duration, response_bytes)
+
+    def clear(self):
+        with self.lock:
+            self.stats.clear()
+
+    def render(self):
+        with self.lock:
+            snapshot = [
+                (view, method, stats, stats.quantiles())
+                for (view, method), stats in sorted(self.stats.items())
+            ]
+
+        lines = [
+            "# HELP join_request_duration_seconds Request latency per view.",
+            "# TYPE join_request_duration_seconds summary",
+        ]
+        for view, method, stats, quantiles in snapshot:
+            labels = f'view="{view}",method="{method}"'
+            for quantile, value in quantiles.items():
+                lines.append(
+                    f"join_request_duration_seconds"
+                    f'{{{labels},quantile="{quantile}"}} {value:.6f}'
+                )
+            lines += [
+                f"join_request_duration_seconds_sum{{{labels}}} {stats.duration:.6f}",
+                f"join_request_duration_seconds_count{{{labels}}} {stats.requests}",
+            ]
+
+        counters = [
+            ("join_request_queries_total", "SQL queries per view.", "queries"),
+            ("join_request_sql_seconds_total", "SQL time per view.", "sql_duration"),
+            ("join_response_bytes_total", "Response bytes per view.", "response_bytes"),
+        ]
+        for name, help_text, attribute in counters:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for view, method, stats, _ in snapshot:
+                value = getattr(stats, attribute)
+                if isinstance(value, float):
+                    value = f"{value:.6f}"
+                lines.append(f'{name}{{view="{view}",method="{method}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,223 @@
+import asyncio
+import gzip
+import re
+import time
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .metrics import QueryTimer, current_timer, get_metrics_settings, registry
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+ACCEPT_ENCODING_RE = re.compile(r"^\s*([^\s;]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$")
+
+
+def get_compression_settings():
+    defaults = {
+        "MIN_SIZE": 1024,
+        "GZIP_LEVEL": 6,
+        "BROTLI_QUALITY": 4,
+        "CONTENT_TYPES": ["application/json"],
+    }
+    return {**defaults, **getattr(settings, "JOIN_COMPRESSION", {})}
+
+
+def parse_accept_encoding(header):
+    """
+    Return the accepted codings mapped to their quality value.
+    """
+    accepted = {}
+
+    for part in header.split(","):
+        match = ACCEPT_ENCODING_RE.match(part)
+        if not match:
+            continue
+
+        coding, quality = match.groups()
+        try:
+            accepted[coding.lower()] = float(quality) if quality else 1.0
+        except ValueError:
+            continue
+
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = parse_accept_encoding(header)
+    available = (["br"] if brotli is not None else []) + ["gzip"]
+    candidates = [
+        coding
+        for coding in available
+        if accepted.get(coding, accepted.get("*", 0)) > 0
+    ]
+
+    if not candidates:
+        return None
+
+    # Prefer the client's highest quality, brotli on ties.
+    return max(candidates, key=lambda coding: accepted.get(coding, accepted.get("*")))
+
+
+def compress(content, encoding, config):
+    if encoding == "br":
+        return brotli.compress(content, quality=config["BROTLI_QUALITY"])
+
+    return gzip.compress(content, compresslevel=config["GZIP_LEVEL"], mtime=0)
+
+
+class AsyncCapableMiddleware:
+    """
+    Middleware that runs natively in both the WSGI and the ASGI handler, so
+    async views under ASGI are not pushed back into a thread by it.
+
+    Subclasses implement `__call__` for sync and `__acall__` for async
+    requests; Django picks the mode from `get_response`.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+
+        if self.is_async:
+            # Tells Django (and asyncio.iscoroutinefunction) to await us.
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+
+class CompressionMiddleware(AsyncCapableMiddleware):
+    """
+    Compress API responses with brotli (when installed) or gzip, whichever
+    the client prefers in `Accept-Encoding`.
+
+    Small bodies are sent as they are, below JOIN_COMPRESSION["MIN_SIZE"]
+    compression costs more than it saves. Like Django's GZipMiddleware the
+    ETag is made weak, as the bytes on the wire differ per encoding.
+    """
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.process_response(request, await self.get_response(request))
+
+    def process_response(self, request, response):
+        config = get_compression_settings()
+
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or len(response.content) < config["MIN_SIZE"]
+            or response.get("Content-Type", "").split(";")[0].strip()
+            not in config["CONTENT_TYPES"]
+        ):
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+
+        if encoding is None:
+            return response
+
+        compressed = compress(response.content, encoding, config)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+
+        return response
+
+
+class PerformanceMiddleware(AsyncCapableMiddleware):
+    """
+    Measure latency, SQL queries, SQL time and response size of every
+    request handled by a `join.views` class, send them back as a
+    `Server-Timing` header and record them in the metrics registry served
+    at `metrics/`.
+
+    Queries are attributed to the request through a context variable, which
+    `sync_to_async` carries into the thread running the database work under
+    ASGI (see `metrics.time_query`).
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+
+        if self.is_async:
+            # Django would run a sync `process_view` in a thread.
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        if not get_metrics_settings()["ENABLED"]:
+            return self.get_response(request)
+
+        timer = QueryTimer()
+        start = time.perf_counter()
+        token = current_timer.set(timer)
+
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+
+        return self.process_response(request, response, timer, start)
+
+    async def __acall__(self, request):
+        if not get_metrics_settings()["ENABLED"]:
+            return await self.get_response(request)
+
+        timer = QueryTimer()
+        start = time.perf_counter()
+        token = current_timer.set(timer)
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timer.reset(token)
+
+        return self.process_response(request, response, timer, start)
+
+    def process_response(self, request, response, timer, start):
+        view = getattr(request, "join_view_name", None)
+        if view is None:
+            return response
+
+        duration = time.perf_counter() - start
+        size = 0 if response.streaming else len(response.content)
+        registry.record(
+            view, request.method, duration, timer.count, timer.duration, size
+        )
+        response["Server-Timing"] = (
+            f"app;dur={duration * 1000:.1f}, "
+            f'db;dur={timer.duration * 1000:.1f};desc="{timer.count} queries"'
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        self.set_view_name(request, view_func)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        self.set_view_name(request, view_func)
+
+    def set_view_name(self, request, view_func):
+        view_class = getattr(view_func, "view_class", None)
+
+        if view_class is not None and view_class.__module__ == "join.views":
+            request.join_view_name = view_class.__name__
@@ -0,0 +1,38 @@
+# Generated by Django 4.0.6 on 2026-10-18 11:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('join', '0007_task_change_tracking'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='subtask',
+            options={'ordering': ['position', 'id']},
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='position',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='subtask',
+            name='task',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, to='join.task'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='subtasks_done',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='subtasks_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,73 @@
+from django.db import migrations
+
+
+def parse_subtask(item):
+    """
+    The JSON field was free-form, accept the shapes the frontend has used.
+    """
+    if isinstance(item, str):
+        return item, False
+
+    if not isinstance(item, dict):
+        return str(item), False
+
+    title = item.get("title", item.get("name", item.get("text", "")))
+    complete = item.get("complete", item.get("done", item.get("completed", False)))
+    return str(title)[:100], bool(complete)
+
+
+def copy_subtasks(apps, schema_editor):
+    Task = apps.get_model("join", "Task")
+    Subtask = apps.get_model("join", "Subtask")
+
+    # Subtasks without a task were only ever created in the admin and
+    # cannot be shown anywhere.
+    Subtask.objects.filter(task__isnull=True).delete()
+
+    batch = []
+    for task in Task.objects.only("id", "subtasks").iterator(chunk_size=1000):
+        items = [parse_subtask(item) for item in task.subtasks or []]
+
+        for position, (title, complete) in enumerate(items):
+            batch.append(
+                Subtask(task_id=task.id, title=title, complete=complete, position=position)
+            )
+
+        if items:
+            Task.objects.filter(pk=task.pk).update(
+                subtasks_total=len(items),
+                subtasks_done=sum(complete for _, complete in items),
+            )
+
+        if len(batch) >= 1000:
+            Subtask.objects.bulk_create(batch)
+            batch = []
+
+    Subtask.objects.bulk_create(batch)
+
+
+def restore_subtasks(apps, schema_editor):
+    Task = apps.get_model("join", "Task")
+    Subtask = apps.get_model("join", "Subtask")
+
+    subtasks = {}
+    for subtask in Subtask.objects.order_by("task_id", "position", "id"):
+        subtasks.setdefault(subtask.task_id, []).append(
+            {"title": subtask.title, "complete": subtask.complete}
+        )
+
+    for task_id, items in subtasks.items():
+        Task.objects.filter(pk=task_id).update(subtasks=items)
+
+    Subtask.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('join', '0008_subtask_task'),
+    ]
+
+    operations = [
+        migrations.RunPython(copy_subtasks, restore_subtasks),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.0.6 on 2026-10-18 11:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('join', '0009_copy_subtasks'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='task',
+            name='subtasks',
+        ),
+        migrations.AlterField(
+            model_name='subtask',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='join.task'),
+        ),
+        migrations.AddIndex(
+            model_name='subtask',
+            index=models.Index(fields=['task', 'position'], name='subtask_task_position_idx'),
+        ),
+    ]
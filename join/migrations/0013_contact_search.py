@@ -0,0 +1,82 @@
+# Generated by Django 4.0.6 on 2026-10-18 10:41
+
+from django.db import migrations, models
+
+# External content FTS5 index over join_contact, kept in sync by triggers so
+# every write path (views, admin, bulk updates) updates it. A later migration
+# that makes SQLite rebuild join_contact drops the triggers and has to
+# create them again.
+FTS_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE join_contact_fts USING fts5(
+        name, email, phone,
+        content='join_contact', content_rowid='id', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER join_contact_fts_insert AFTER INSERT ON join_contact BEGIN
+        INSERT INTO join_contact_fts(rowid, name, email, phone)
+        VALUES (new.id, new.name, new.email, new.phone);
+    END
+    """,
+    """
+    CREATE TRIGGER join_contact_fts_delete AFTER DELETE ON join_contact BEGIN
+        INSERT INTO join_contact_fts(join_contact_fts, rowid, name, email, phone)
+        VALUES ('delete', old.id, old.name, old.email, old.phone);
+    END
+    """,
+    """
+    CREATE TRIGGER join_contact_fts_update AFTER UPDATE ON join_contact BEGIN
+        INSERT INTO join_contact_fts(join_contact_fts, rowid, name, email, phone)
+        VALUES ('delete', old.id, old.name, old.email, old.phone);
+        INSERT INTO join_contact_fts(rowid, name, email, phone)
+        VALUES (new.id, new.name, new.email, new.phone);
+    END
+    """,
+    "INSERT INTO join_contact_fts(join_contact_fts) VALUES ('rebuild')",
+]
+
+FTS_DROP = [
+    "DROP TRIGGER IF EXISTS join_contact_fts_insert",
+    "DROP TRIGGER IF EXISTS join_contact_fts_delete",
+    "DROP TRIGGER IF EXISTS join_contact_fts_update",
+    "DROP TABLE IF EXISTS join_contact_fts",
+]
+
+
+def create_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        options = {row[0] for row in cursor.fetchall()}
+
+    if "ENABLE_FTS5" not in options:
+        return
+
+    for statement in FTS_SCHEMA:
+        schema_editor.execute(statement)
+
+
+def drop_fts_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+
+    for statement in FTS_DROP:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('join', '0012_unique_user_email'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contact',
+            index=models.Index(fields=['user', 'name', 'id'], name='contact_user_name_idx'),
+        ),
+        migrations.RunPython(create_fts_index, drop_fts_index),
+    ]
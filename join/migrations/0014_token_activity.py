@@ -0,0 +1,42 @@
+# Generated by Django 4.0.6 on 2026-10-18 11:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.utils import timezone
+
+
+def track_existing_tokens(apps, schema_editor):
+    Token = apps.get_model("authtoken", "Token")
+    TokenActivity = apps.get_model("join", "TokenActivity")
+
+    # When existing tokens were last used is unknown, give them a full
+    # window instead of logging everybody out.
+    now = timezone.now()
+    keys = Token.objects.values_list("key", flat=True).iterator(chunk_size=1000)
+    batch = []
+    for key in keys:
+        batch.append(TokenActivity(token_id=key, last_seen=now))
+        if len(batch) >= 1000:
+            TokenActivity.objects.bulk_create(batch)
+            batch = []
+
+    TokenActivity.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authtoken', '0003_tokenproxy'),
+        ('join', '0013_contact_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TokenActivity',
+            fields=[
+                ('token', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='activity', serialize=False, to='authtoken.token')),
+                ('last_seen', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.RunPython(track_existing_tokens, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.0.6 on 2026-10-18 11:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('join', '0014_token_activity'),
+    ]
+
+    operations = [
+        # The table Django created for the M2M stays as it is, only the
+        # model state learns about it.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='TaskAssignment',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='join.task')),
+                        ('customuser', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'join_task_assigned_users',
+                        'unique_together': {('task', 'customuser')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='task',
+                    name='assigned_users',
+                    field=models.ManyToManyField(related_name='assigned_tasks', through='join.TaskAssignment', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='taskassignment',
+            index=models.Index(fields=['customuser', 'task'], name='assignment_user_task_idx'),
+        ),
+    ]
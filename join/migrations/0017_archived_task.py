@@ -0,0 +1,40 @@
+# Generated by Django 4.0.6 on 2026-10-18 11:15
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('join', '0016_task_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=100)),
+                ('priority', models.CharField(max_length=20)),
+                ('category_id', models.BigIntegerField()),
+                ('author_id', models.BigIntegerField()),
+                ('due_date', models.DateField()),
+                ('completed_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('data', models.JSONField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'updated_at'], name='task_status_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['completed_at', 'id'], name='archive_completed_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['due_date', 'id'], name='archive_due_date_id_idx'),
+        ),
+    ]
@@ -1,4 +1,6 @@
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 import datetime
 from django.contrib.auth.models import AbstractUser
 
@@ -10,6 +12,15 @@ class CustomUser(AbstractUser):
     initials = models.CharField(max_length=5)
     color = models.CharField(max_length=10)
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            models.UniqueConstraint(
+                fields=["email"],
+                condition=~models.Q(email=""),
+                name="unique_user_email",
+            ),
+        ]
+
 
 class Contact(models.Model):
     user = models.ForeignKey(
@@ -21,6 +32,12 @@ class Contact(models.Model):
     initials = models.CharField(max_length=5)
     color = models.CharField(max_length=100)
 
+    class Meta:
+        indexes = [
+            # Contact lists are per user and sorted by name, see ContactView.
+            models.Index(fields=["user", "name", "id"], name="contact_user_name_idx"),
+        ]
+
 
 class Category(models.Model):
     name = models.CharField(max_length=100)
@@ -28,8 +45,47 @@ class Category(models.Model):
 
 
 class Subtask(models.Model):
+    task = models.ForeignKey("Task", on_delete=models.CASCADE)
     title = models.CharField(max_length=100)
     complete = models.BooleanField(default=False)
+    position = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["position", "id"]
+        indexes = [
+            models.Index(fields=["task", "position"], name="subtask_task_position_idx"),
+        ]
+
+
+class TaskQuerySet(models.QuerySet):
+    def for_list(self):
+        """
+        Read path for serializing many tasks: joins the foreign keys and loads
+        all assignees and subtasks in one extra query each instead of one
+        query per task.
+        """
+        return self.select_related("category", "author").prefetch_related(
+            models.Prefetch(
+                "assigned_users", queryset=CustomUser.objects.only("id").order_by("id")
+            ),
+            "subtask_set",
+        )
+
+    def refresh_subtask_counters(self):
+        """
+        Recount the subtasks of the selected tasks in a single UPDATE.
+        """
+        subtasks = Subtask.objects.filter(task=models.OuterRef("pk")).order_by()
+        total = subtasks.values("task").annotate(count=models.Count("id"))
+        done = subtasks.filter(complete=True).values("task")
+        done = done.annotate(count=models.Count("id"))
+
+        return self.update(
+            subtasks_total=Coalesce(models.Subquery(total.values("count")), 0),
+            subtasks_done=Coalesce(models.Subquery(done.values("count")), 0),
+            updated_at=timezone.now(),
+            version=models.F("version") + 1,
+        )
 
 
 class Task(models.Model):
@@ -40,7 +96,165 @@ class Task(models.Model):
     author = models.ForeignKey(CustomUser, on_delete=models.DO_NOTHING)
     status = models.CharField(max_length=20, default="todo")
     priority = models.CharField(max_length=20, default="low")
-    assigned_users = models.ManyToManyField(CustomUser, related_name="assigned_tasks")
+    assigned_users = models.ManyToManyField(
+        CustomUser, related_name="assigned_tasks", through="TaskAssignment"
+    )
     category = models.ForeignKey(Category, on_delete=models.DO_NOTHING, default=None)
+    subtasks_done = models.PositiveIntegerField(default=0)
+    subtasks_total = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    # Incremented by every write, checked by conditional updates (If-Match).
+    version = models.PositiveIntegerField(default=1)
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["due_date", "id"], name="task_due_date_id_idx"),
+            models.Index(fields=["status", "id"], name="task_status_id_idx"),
+            models.Index(
+                fields=["status", "due_date", "id"], name="task_status_due_date_id_idx"
+            ),
+            models.Index(fields=["priority", "id"], name="task_priority_id_idx"),
+            # Done tasks by age, for the archival (see join/archive.py).
+            models.Index(
+                fields=["status", "updated_at"], name="task_status_updated_at_idx"
+            ),
+        ]
+
+    def apply_changes(self, data):
+        """
+        Set the given field values and return the names of those that
+        actually changed. Foreign keys compare by id, without loading the
+        related object.
+        """
+        changed = []
+
+        for name, value in data.items():
+            field = self._meta.get_field(name)
+            current = getattr(self, field.attname)
+            if field.is_relation and name != field.attname:
+                value_id = None if value is None else value.pk
+            else:
+                value_id = value
+
+            if current != value_id:
+                setattr(self, name, value)
+                changed.append(field.name)
+
+        return changed
+
+
+class TokenActivity(models.Model):
+    """
+    When an auth token was last used, for expiring idle tokens (see
+    join/tokens.py). Written at most once per touch interval per token.
+    """
+
+    token = models.OneToOneField(
+        "authtoken.Token",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="activity",
+    )
+    last_seen = models.DateTimeField(db_index=True)
+
+
+class TaskAssignment(models.Model):
+    """
+    The `Task.assigned_users` table, declared to index it by user: a user's
+    tasks are one range scan of (customuser, task).
+    """
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE)
+    customuser = models.ForeignKey(CustomUser, on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = "join_task_assigned_users"
+        unique_together = [("task", "customuser")]
+        indexes = [
+            models.Index(fields=["customuser", "task"], name="assignment_user_task_idx"),
+        ]
+
+
+class TaskTombstone(models.Model):
+    """
+    Records deleted tasks so delta syncs can tell clients what to remove.
+    """
+
+    task_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+
+class TableVersion(models.Model):
+    """
+    Change counter per table (or per user scope), bumped on every write and
+    used to build cheap ETags for the list endpoints.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+
+class OutboxEmail(models.Model):
+    """
+    An e-mail waiting to be delivered by the outbox worker (see join/outbox.py).
+    """
+
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (SENDING, "Sending"),
+        (SENT, "Sent"),
+        (FAILED, "Failed"),
+    ]
+
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=200)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim = models.UUIDField(null=True, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "next_attempt_at"], name="outbox_status_next_idx"
+            ),
+        ]
+
+
+class ArchivedTask(models.Model):
+    """
+    A done task moved off the board by the archival (see join/archive.py),
+    stored as its API representation plus the columns archive queries filter
+    on. It has no foreign keys, so the archive can live in its own database.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=100)
+    priority = models.CharField(max_length=20)
+    category_id = models.BigIntegerField()
+    author_id = models.BigIntegerField()
+    due_date = models.DateField()
+    completed_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+    data = models.JSONField()
 
-    subtasks = models.JSONField(default=list)
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["completed_at", "id"], name="archive_completed_id_idx"
+            ),
+            models.Index(fields=["due_date", "id"], name="archive_due_date_id_idx"),
+        ]
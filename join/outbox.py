@@ -0,0 +1,204 @@
+import datetime
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.template.loader import get_template
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+# Emails stuck in "sending" this long (e.g. the worker died) are retried.
+CLAIM_TIMEOUT = datetime.timedelta(minutes=10)
+
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="join-outbox")
+
+# Wakes the delivery thread up when the next retry is due.
+retry_timer = None
+retry_lock = threading.Lock()
+
+
+def get_outbox_settings():
+    defaults = {
+        "DELIVERY": "thread",
+        "BATCH_SIZE": 50,
+        "MAX_ATTEMPTS": 5,
+        "RETRY_BACKOFF": 60,
+    }
+    return {**defaults, **getattr(settings, "JOIN_EMAIL_OUTBOX", {})}
+
+
+@lru_cache(maxsize=None)
+def get_compiled_template(name):
+    """
+    Load and compile an e-mail template once per process.
+    """
+    return get_template(name)
+
+
+def render_email_template(name, context):
+    return get_compiled_template(name).render(context)
+
+
+def queue_email(subject, body, from_email, to, html_body=""):
+    """
+    Store an e-mail in the outbox and, unless delivery is left to
+    `manage.py send_outbox`, deliver it from a background thread once the
+    current transaction has committed.
+    """
+    email = OutboxEmail.objects.create(
+        subject=subject,
+        body=body,
+        html_body=html_body,
+        from_email=from_email,
+        to=to,
+    )
+
+    if get_outbox_settings()["DELIVERY"] == "thread":
+        transaction.on_commit(lambda: executor.submit(deliver_in_background))
+
+    return email
+
+
+def deliver_in_background():
+    try:
+        deliver_pending()
+        schedule_retry()
+    except Exception:
+        logger.exception("Outbox delivery failed")
+    finally:
+        close_old_connections()
+
+
+def schedule_retry():
+    """
+    Run the delivery thread again when the next e-mail waiting for a retry
+    is due, replacing the timer of an earlier run. Retries left over by a
+    process that exited are only sent with the next queued e-mail or by
+    `manage.py send_outbox`.
+    """
+    global retry_timer
+
+    next_attempt_at = (
+        OutboxEmail.objects.filter(status=OutboxEmail.PENDING)
+        .order_by("next_attempt_at")
+        .values_list("next_attempt_at", flat=True)
+        .first()
+    )
+
+    with retry_lock:
+        if retry_timer is not None:
+            retry_timer.cancel()
+            retry_timer = None
+
+        if next_attempt_at is None:
+            return
+
+        delay = max((next_attempt_at - timezone.now()).total_seconds(), 0)
+        retry_timer = threading.Timer(
+            delay, executor.submit, args=[deliver_in_background]
+        )
+        retry_timer.daemon = True
+        retry_timer.start()
+
+
+def claim_batch(batch_size):
+    """
+    Mark a batch of due e-mails as being sent by this worker. The claim id
+    keeps concurrent workers from sending the same e-mail twice.
+    """
+    now = timezone.now()
+    due = Q(status=OutboxEmail.PENDING, next_attempt_at__lte=now) | Q(
+        status=OutboxEmail.SENDING, claimed_at__lt=now - CLAIM_TIMEOUT
+    )
+    ids = list(
+        OutboxEmail.objects.filter(due)
+        .order_by("next_attempt_at")
+        .values_list("id", flat=True)[:batch_size]
+    )
+    claim = uuid.uuid4()
+
+    OutboxEmail.objects.filter(due, id__in=ids).update(
+        status=OutboxEmail.SENDING, claim=claim, claimed_at=now
+    )
+    return list(OutboxEmail.objects.filter(claim=claim, status=OutboxEmail.SENDING))
+
+
+def build_message(email, connection):
+    message = EmailMultiAlternatives(
+        email.subject,
+        email.body,
+        email.from_email,
+        email.to,
+        connection=connection,
+    )
+
+    if email.html_body:
+        message.attach_alternative(email.html_body, "text/html")
+
+    return message
+
+
+def record_failure(email, error, config):
+    email.attempts += 1
+    email.last_error = str(error)
+    email.claim = None
+
+    if email.attempts >= config["MAX_ATTEMPTS"]:
+        email.status = OutboxEmail.FAILED
+    else:
+        email.status = OutboxEmail.PENDING
+        backoff = config["RETRY_BACKOFF"] * 2 ** (email.attempts - 1)
+        email.next_attempt_at = timezone.now() + datetime.timedelta(seconds=backoff)
+
+    email.save(
+        update_fields=["attempts", "last_error", "claim", "status", "next_attempt_at"]
+    )
+
+
+def deliver_pending():
+    """
+    Send all due e-mails in batches over one reused SMTP connection and
+    return the number sent. Failed e-mails are retried with exponential
+    backoff until MAX_ATTEMPTS is reached.
+    """
+    config = get_outbox_settings()
+    sent = 0
+    connection = get_connection()
+
+    try:
+        while True:
+            batch = claim_batch(config["BATCH_SIZE"])
+
+            if not batch:
+                return sent
+
+            delivered = []
+
+            for email in batch:
+                try:
+                    # Opens the connection once, later calls reuse it.
+                    connection.open()
+                    connection.send_messages([build_message(email, connection)])
+                except Exception as error:
+                    logger.warning("Sending e-mail %s failed: %s", email.pk, error)
+                    record_failure(email, error, config)
+                    # The connection may be broken, the next e-mail reconnects.
+                    connection.close()
+                else:
+                    delivered.append(email.pk)
+
+            OutboxEmail.objects.filter(pk__in=delivered).update(
+                status=OutboxEmail.SENT, sent_at=timezone.now(), claim=None
+            )
+            sent += len(delivered)
+    finally:
+        connection.close()
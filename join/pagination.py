@@ -0,0 +1,135 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.response import Response
+from rest_framework.serializers import ValidationError
+
+from .filters import is_valid_id
+
+
+class KeysetPagination:
+    """
+    Cursor (keyset) pagination over a unique `(field, id)` ordering.
+
+    The cursor encodes the sort value and id of the last row of a page, so
+    the next page is a simple range scan on the matching composite index
+    instead of an OFFSET that gets slower the further you page.
+    """
+
+    ordering_fields = ("due_date", "status")
+    default_ordering = "due_date"
+    default_limit = 50
+    max_limit = 200
+
+    def __init__(self, request):
+        params = request.query_params
+        self.field = params.get("ordering", self.default_ordering)
+
+        if self.field not in self.ordering_fields:
+            raise ValidationError(
+                {"ordering": f"Must be one of: {', '.join(self.ordering_fields)}"}
+            )
+
+        self.limit = self.parse_limit(params.get("limit"))
+        self.cursor = self.decode_cursor(params.get("cursor"))
+        self.next_cursor = None
+
+    @classmethod
+    def is_requested(cls, request):
+        """
+        Pagination is opt-in so existing clients keep receiving a plain list.
+        """
+        params = request.query_params
+        return "limit" in params or "cursor" in params
+
+    def parse_limit(self, value):
+        if value is None:
+            return self.default_limit
+
+        try:
+            limit = int(value)
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+
+        if limit < 1:
+            raise ValidationError({"limit": "Must be a positive integer."})
+
+        return min(limit, self.max_limit)
+
+    def decode_cursor(self, value):
+        if not value:
+            return None
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(value.encode()).decode())
+            position, pk = payload["p"], int(payload["id"])
+            field = payload["f"]
+        except (ValueError, KeyError, TypeError):
+            raise ValidationError({"cursor": "Invalid cursor."})
+
+        if not is_valid_id(pk):
+            raise ValidationError({"cursor": "Invalid cursor."})
+
+        if field != self.field:
+            raise ValidationError({"cursor": "Cursor does not match ordering."})
+
+        return position, pk
+
+    def encode_cursor(self, row):
+        position = self.get_value(row, self.field)
+        payload = {
+            "f": self.field,
+            "p": position.isoformat() if hasattr(position, "isoformat") else position,
+            "id": self.get_value(row, "id"),
+        }
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+    @staticmethod
+    def get_value(row, name):
+        return row[name] if isinstance(row, dict) else getattr(row, name)
+
+    def paginate_queryset(self, queryset):
+        queryset = queryset.order_by(self.field, "id")
+
+        if self.cursor is not None:
+            position, pk = self.cursor
+            position = self.parse_position(queryset.model, position)
+            queryset = queryset.filter(
+                Q(**{f"{self.field}__gt": position})
+                | Q(**{self.field: position, "id__gt": pk})
+            )
+
+        page = list(queryset[: self.limit + 1])
+
+        if len(page) > self.limit:
+            page = page[: self.limit]
+            self.next_cursor = self.encode_cursor(page[-1])
+
+        return page
+
+    def parse_position(self, model, value):
+        """
+        The cursor's sort value as the type of the ordering field, a cursor
+        decoded fine can still carry a value the field cannot hold.
+        """
+        try:
+            if value is None:
+                raise ValueError
+            return model._meta.get_field(self.field).to_python(value)
+        except (DjangoValidationError, ValueError, TypeError):
+            raise ValidationError({"cursor": "Invalid cursor."})
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.next_cursor, "results": data})
+
+
+class ContactPagination(KeysetPagination):
+    ordering_fields = ("name",)
+    default_ordering = "name"
+
+
+class ArchivePagination(KeysetPagination):
+    ordering_fields = ("completed_at", "due_date")
+    default_ordering = "completed_at"
@@ -0,0 +1,172 @@
+import asyncio
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import AuthenticationFailed
+
+from .authentication import CachedTokenAuthentication
+from .events import get_broker
+from .renderers import FastJSONRenderer
+
+WEBSOCKET_PATH = "/ws/tasks/"
+EVENTS_PATH = "/events/tasks/"
+
+
+@sync_to_async
+def get_user(scope):
+    """
+    Resolve the DRF token sent as `?token=` (browsers cannot set headers on
+    WebSockets or EventSource) or in an `Authorization: Token` header.
+    """
+    query = parse_qs(scope.get("query_string", b"").decode())
+    key = query.get("token", [None])[0]
+
+    if key is None:
+        headers = dict(scope.get("headers", []))
+        auth = headers.get(b"authorization", b"").decode().split()
+        if len(auth) == 2 and auth[0].lower() == "token":
+            key = auth[1]
+
+    if not key:
+        return None
+
+    try:
+        user, _ = CachedTokenAuthentication().authenticate_credentials(key)
+    except AuthenticationFailed:
+        return None
+
+    return user
+
+
+def encode(event):
+    return FastJSONRenderer().render(event)
+
+
+async def wait_for_disconnect(receive, disconnect_type):
+    while True:
+        message = await receive()
+        if message["type"] == disconnect_type:
+            return
+
+
+async def stream(subscription, receive, disconnect_type, send_event, keepalive=None):
+    """
+    Forward events to the client until it disconnects.
+    """
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive, disconnect_type))
+
+    try:
+        while True:
+            next_event = asyncio.ensure_future(subscription.get())
+            done, _ = await asyncio.wait(
+                [next_event, disconnected],
+                timeout=keepalive,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            if disconnected in done:
+                next_event.cancel()
+                return
+
+            if next_event in done:
+                await send_event(next_event.result())
+            else:
+                next_event.cancel()
+                await send_event(None)
+    finally:
+        disconnected.cancel()
+
+
+async def websocket_tasks(scope, receive, send):
+    message = await receive()
+    if message["type"] != "websocket.connect":
+        return
+
+    user = await get_user(scope)
+    if user is None:
+        await send({"type": "websocket.close", "code": 4401})
+        return
+
+    await send({"type": "websocket.accept"})
+    broker = get_broker()
+    subscription = broker.subscribe()
+
+    async def send_event(event):
+        await send({"type": "websocket.send", "text": encode(event).decode()})
+
+    try:
+        await stream(subscription, receive, "websocket.disconnect", send_event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def server_sent_tasks(scope, receive, send, keepalive=15):
+    user = await get_user(scope)
+    if user is None:
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 401,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send(
+            {
+                "type": "http.response.body",
+                "body": encode({"detail": "Invalid token."}),
+            }
+        )
+        return
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        }
+    )
+    broker = get_broker()
+    subscription = broker.subscribe()
+
+    async def send_event(event):
+        if event is None:
+            # A comment line keeps proxies from closing an idle stream.
+            body = b": keepalive\n\n"
+        else:
+            body = b"data: " + encode(event) + b"\n\n"
+        await send({"type": "http.response.body", "body": body, "more_body": True})
+
+    try:
+        await stream(subscription, receive, "http.disconnect", send_event, keepalive)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+class RealtimeRouter:
+    """
+    ASGI application serving the task event stream as a WebSocket at
+    `/ws/tasks/` and as Server-Sent Events at `/events/tasks/`, and handing
+    every other request to Django.
+    """
+
+    def __init__(self, django_application):
+        self.django_application = django_application
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path")
+
+        if scope["type"] == "websocket" and path == WEBSOCKET_PATH:
+            return await websocket_tasks(scope, receive, send)
+
+        if scope["type"] == "http" and path == EVENTS_PATH:
+            return await server_sent_tasks(scope, receive, send)
+
+        if scope["type"] == "websocket":
+            await send({"type": "websocket.close", "code": 4404})
+            return
+
+        return await self.django_application(scope, receive, send)
@@ -0,0 +1,54 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+# Created by migration 0013_contact_search where SQLite has FTS5.
+FTS_TABLE = "join_contact_fts"
+
+_fts_tables = {}
+
+
+def get_search_settings():
+    defaults = {"FTS": True}
+    return {**defaults, **getattr(settings, "JOIN_CONTACT_SEARCH", {})}
+
+
+def fts_enabled():
+    """
+    Whether contact search can use the FTS5 index: only on SQLite, when it
+    is enabled in JOIN_CONTACT_SEARCH and the migration could create it
+    (FTS5 is compiled into nearly every SQLite build, but not all).
+    """
+    if connection.vendor != "sqlite" or not get_search_settings()["FTS"]:
+        return False
+
+    name = connection.settings_dict["NAME"]
+    if name not in _fts_tables:
+        _fts_tables[name] = FTS_TABLE in connection.introspection.table_names()
+
+    return _fts_tables[name]
+
+
+def fts_query(term):
+    """
+    Turn user input into an FTS5 query matching every word as a prefix.
+    """
+    words = re.findall(r"\w+", term)
+    return " ".join('"{}"*'.format(word) for word in words)
+
+
+def fts_matches(term):
+    """
+    Subquery of the ids of contacts matching `term`, or None when the term
+    has no searchable words.
+    """
+    query = fts_query(term)
+
+    if not query:
+        return None
+
+    return RawSQL(
+        f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [query]
+    )
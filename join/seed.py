@@ -0,0 +1,215 @@
+import datetime
+import itertools
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+
+from .etags import CATEGORIES, TASKS, USERS, bump_version
+from .models import Category, Contact, CustomUser, Subtask, Task
+
+STATUSES = ["todo", "inprogress", "awaitfeedback", "done"]
+PRIORITIES = ["low", "medium", "urgent"]
+COLORS = ["#ff7a00", "#9327ff", "#29abe2", "#fc71ff", "#1fd7c1", "#ffbb2b"]
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def insert_rows(model, fields, rows):
+    """
+    Insert plain value tuples with one `executemany`, skipping the model
+    layer. Only for rows that need no defaults, signals or returned keys.
+    """
+    quote = connection.ops.quote_name
+    columns = ", ".join(quote(model._meta.get_field(name).column) for name in fields)
+    placeholders = ", ".join(["%s"] * len(fields))
+
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {quote(model._meta.db_table)} ({columns}) "
+            f"VALUES ({placeholders})",
+            rows,
+        )
+
+
+class BoardSeeder:
+    """
+    Bulk generates a synthetic board: users, categories, contacts and tasks
+    with assignees and subtasks.
+
+    Rows are written in chunks of `batch_size`, one transaction per chunk,
+    and all users share one password hash computed up front. The same
+    `seed` always produces the same board. `progress` is called with
+    (label, done, total, seconds) after every chunk.
+    """
+
+    def __init__(self, seed=0, batch_size=5000, start_date=None, progress=None):
+        self.rng = random.Random(seed)
+        self.batch_size = batch_size
+        self.start_date = start_date or datetime.date(2025, 1, 1)
+        self.progress = progress or (lambda *args: None)
+
+    @staticmethod
+    def last_pk(model):
+        return model.objects.order_by("-pk").values_list("pk", flat=True).first() or 0
+
+    @staticmethod
+    def pks_after(model, last_pk):
+        """
+        The primary keys inserted after `last_pk`, for databases where
+        `bulk_create` cannot return them.
+        """
+        pks = model.objects.filter(pk__gt=last_pk).order_by("pk")
+        return list(pks.values_list("pk", flat=True))
+
+    def insert(self, label, model, objects, total):
+        """
+        Bulk insert `objects` chunk by chunk and return the new primary keys.
+        """
+        started = time.perf_counter()
+        returns_pks = connection.features.can_return_rows_from_bulk_insert
+        last_pk = None if returns_pks else self.last_pk(model)
+        pks, done = [], 0
+
+        for chunk in chunked(objects, self.batch_size):
+            with transaction.atomic():
+                created = model.objects.bulk_create(chunk)
+
+            pks += [obj.pk for obj in created]
+            done += len(chunk)
+            self.progress(label, done, total, time.perf_counter() - started)
+
+        return pks if returns_pks else self.pks_after(model, last_pk)
+
+    def create_users(self, count, prefix, password):
+        password_hash = make_password(password)
+        users = (
+            CustomUser(
+                username=f"{prefix}{i}",
+                email=f"{prefix}{i}@example.com",
+                first_name="First",
+                last_name=f"Last {i}",
+                initials="FL",
+                color=self.rng.choice(COLORS),
+                password=password_hash,
+            )
+            for i in range(count)
+        )
+        return self.insert("users", CustomUser, users, count)
+
+    def create_categories(self, count):
+        categories = (
+            Category(name=f"Category {i}", color=self.rng.choice(COLORS))
+            for i in range(count)
+        )
+        return self.insert("categories", Category, categories, count)
+
+    def create_contacts(self, count, owner_ids):
+        contacts = (
+            Contact(
+                user_id=owner_ids[i % len(owner_ids)],
+                name=f"Contact {i}",
+                email=f"contact{i}@example.com",
+                phone=f"0{self.rng.randrange(10**9):09d}",
+                initials="CO",
+                color=self.rng.choice(COLORS),
+            )
+            for i in range(count)
+        )
+        self.insert("contacts", Contact, contacts, count)
+
+    def create_tasks(self, count, user_ids, category_ids, assignees, subtasks):
+        """
+        Insert tasks chunk by chunk, each chunk followed by its assignee rows
+        on the through table and its subtasks.
+        """
+        through = Task.assigned_users.through
+        assignees = min(assignees, len(user_ids))
+        returns_pks = connection.features.can_return_rows_from_bulk_insert
+        started = time.perf_counter()
+        done = 0
+
+        for chunk in chunked(range(count), self.batch_size):
+            tasks = [
+                Task(
+                    title=f"Task {i}",
+                    description="Synthetic task",
+                    created_at=self.start_date,
+                    due_date=self.start_date
+                    + datetime.timedelta(days=self.rng.randint(-30, 60)),
+                    author_id=self.rng.choice(user_ids),
+                    status=self.rng.choice(STATUSES),
+                    priority=self.rng.choice(PRIORITIES),
+                    category_id=self.rng.choice(category_ids),
+                    subtasks_done=min(1, subtasks),
+                    subtasks_total=subtasks,
+                )
+                for i in chunk
+            ]
+
+            with transaction.atomic():
+                last_pk = None if returns_pks else self.last_pk(Task)
+                created = Task.objects.bulk_create(tasks)
+
+                if returns_pks:
+                    task_ids = [task.pk for task in created]
+                else:
+                    task_ids = self.pks_after(Task, last_pk)
+
+                # Assignee and subtask rows outnumber the tasks, building
+                # model instances for them would cost more than the inserts.
+                insert_rows(
+                    through,
+                    ["task", "customuser"],
+                    [
+                        (task_id, user_id)
+                        for task_id in task_ids
+                        for user_id in self.rng.sample(user_ids, assignees)
+                    ],
+                )
+                insert_rows(
+                    Subtask,
+                    ["task", "title", "complete", "position"],
+                    [
+                        (task_id, f"Subtask {position}", position == 0, position)
+                        for task_id in task_ids
+                        for position in range(subtasks)
+                    ],
+                )
+
+            done += len(chunk)
+            self.progress("tasks", done, count, time.perf_counter() - started)
+
+    def seed(
+        self,
+        users=10,
+        tasks=1000,
+        contacts=100,
+        categories=1,
+        assignees=3,
+        subtasks=2,
+        prefix="user",
+        password="join-password",
+        contact_owners=None,
+    ):
+        """
+        Create the board and return the ids of the new users. Contacts go
+        round-robin to the first `contact_owners` users (all by default).
+        """
+        user_ids = self.create_users(users, prefix, password)
+        category_ids = self.create_categories(categories)
+        self.create_contacts(contacts, user_ids[: contact_owners or len(user_ids)])
+        self.create_tasks(tasks, user_ids, category_ids, assignees, subtasks)
+
+        # Bulk inserts skip the model signals. Contacts only belong to the
+        # new users, whose contact lists no client can have cached yet.
+        bump_version(TASKS, USERS, CATEGORIES)
+        return user_ids
@@ -1,9 +1,21 @@
-from django.core.mail import EmailMultiAlternatives
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
 from django.dispatch import receiver
-from django.template.loader import render_to_string
 from django.urls import reverse
+from django.utils import timezone
 
-from django_rest_passwordreset.signals import reset_password_token_created
+from django_rest_passwordreset.signals import (
+    post_password_reset,
+    reset_password_token_created,
+)
+from rest_framework.authtoken.models import Token
+
+from .authentication import invalidate_token, invalidate_user_tokens
+from .catalogue import category_written
+from .etags import CATEGORIES, TASKS, USERS, bump_version, contacts_scope
+from .metrics import install_query_timer
+from .models import Category, Contact, CustomUser, Task, TaskTombstone
+from .outbox import queue_email, render_email_template
 
 
 @receiver(reset_password_token_created)
@@ -36,10 +48,15 @@ def password_reset_token_created(
     }
 
     # render email text
-    email_html_message = render_to_string("email/user_reset_password.html", context)
-    email_plaintext_message = render_to_string("email/user_reset_password.txt", context)
+    email_html_message = render_email_template(
+        "email/user_reset_password.html", context
+    )
+    email_plaintext_message = render_email_template(
+        "email/user_reset_password.txt", context
+    )
 
-    msg = EmailMultiAlternatives(
+    # delivered in the background, see join/outbox.py
+    queue_email(
         # title:
         "Password Reset for {title}".format(title="Join"),
         # message:
@@ -48,6 +65,109 @@ def password_reset_token_created(
         "noreply@tobias-bayer.dev",
         # to:
         [reset_password_token.user.email],
+        html_body=email_html_message,
     )
-    msg.attach_alternative(email_html_message, "text/html")
-    msg.send()
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, **kwargs):
+    """
+    Invalidates the ETags of the task list.
+    """
+    bump_version(TASKS)
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    """
+    Leaves a tombstone for delta syncs.
+    """
+    TaskTombstone.objects.create(task_id=instance.pk)
+
+
+@receiver(m2m_changed, sender=Task.assigned_users.through)
+def task_assignees_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Assignee changes do not save the task, so `updated_at` is touched here
+    for delta syncs.
+    """
+    if action in ("post_add", "post_remove"):
+        pks = pk_set if reverse else [instance.pk]
+        tasks = Task.objects.filter(pk__in=pks)
+    elif action == "post_clear" and not reverse:
+        tasks = Task.objects.filter(pk=instance.pk)
+    elif action == "pre_clear" and reverse:
+        # After the clear the user's tasks can no longer be looked up.
+        tasks = Task.objects.filter(assigned_users=instance)
+    else:
+        return
+
+    tasks.update(updated_at=timezone.now())
+    bump_version(TASKS)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, **kwargs):
+    """
+    Invalidates the ETags of the category list and the category catalogue.
+    """
+    bump_version(CATEGORIES)
+    category_written()
+
+
+@receiver(post_save, sender=CustomUser)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    """
+    Invalidates the ETags of the user list and the cached authentication,
+    except for the `last_login` update done on every login.
+    """
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+
+    bump_version(USERS)
+    invalidate_user_tokens(instance)
+
+
+@receiver(pre_delete, sender=CustomUser)
+def user_deleting(sender, instance, **kwargs):
+    """
+    The cascade removes the user from its tasks without any m2m signal.
+    """
+    Task.objects.filter(assigned_users=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=CustomUser)
+def user_deleted(sender, instance, **kwargs):
+    """
+    Deleting a user also removes it from the assignees of tasks.
+    """
+    bump_version(USERS, TASKS)
+
+
+@receiver(post_save, sender=Contact)
+@receiver(post_delete, sender=Contact)
+def contact_changed(sender, instance, **kwargs):
+    """
+    Invalidates the ETags of the owner's contact list.
+    """
+    bump_version(contacts_scope(instance.user_id))
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    """
+    Logout and user deletion remove the token, drop it from the auth cache.
+    """
+    invalidate_token(instance.key)
+
+
+@receiver(post_password_reset)
+def password_reset(sender, user, **kwargs):
+    invalidate_user_tokens(user)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    install_query_timer(connection)
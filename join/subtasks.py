@@ -0,0 +1,24 @@
+from .etags import TASKS, bump_version
+from .models import Subtask, Task
+
+
+def replace_subtasks(subtasks_by_task):
+    """
+    Replace the subtasks of several tasks with one delete and one insert,
+    then recount their progress counters. The writes bypass model signals,
+    so the TASKS version is bumped here.
+
+    Args:
+        subtasks_by_task: Maps task ids to lists of validated subtask data.
+    """
+    if not subtasks_by_task:
+        return
+
+    Subtask.objects.filter(task_id__in=subtasks_by_task).delete()
+    Subtask.objects.bulk_create(
+        Subtask(task_id=task_id, position=position, **data)
+        for task_id, items in subtasks_by_task.items()
+        for position, data in enumerate(items)
+    )
+    Task.objects.filter(pk__in=subtasks_by_task).refresh_subtask_counters()
+    bump_version(TASKS)
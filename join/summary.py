@@ -0,0 +1,158 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from .models import Task
+
+DATA_KEY = "join:tasks:summary"
+DONE = "done"
+URGENT = "urgent"
+
+
+def get_summary_settings():
+    defaults = {"TTL": 10, "CACHE_ALIAS": None}
+    return {**defaults, **getattr(settings, "JOIN_TASK_SUMMARY", {})}
+
+
+def get_shared_cache():
+    alias = get_summary_settings()["CACHE_ALIAS"]
+    return caches[alias] if alias else None
+
+
+def compute_summary(today):
+    """
+    Count the tasks per status and priority, the open urgent and overdue
+    tasks and the next open deadline from one grouped query, and the
+    workload per assignee from a second one on the assignment table.
+    """
+    is_open = ~Q(status=DONE)
+    groups = (
+        Task.objects.order_by()
+        .values("status", "priority")
+        .annotate(
+            count=Count("id"),
+            open=Count("id", filter=is_open),
+            overdue=Count("id", filter=is_open & Q(due_date__lt=today)),
+            next_deadline=Min("due_date", filter=is_open & Q(due_date__gte=today)),
+        )
+    )
+
+    summary = {
+        "total": 0,
+        "by_status": {},
+        "by_priority": {},
+        "urgent": 0,
+        "overdue": 0,
+        "next_deadline": None,
+        "next_urgent_deadline": None,
+    }
+    for group in groups:
+        status, priority = group["status"], group["priority"]
+        summary["total"] += group["count"]
+        summary["by_status"][status] = (
+            summary["by_status"].get(status, 0) + group["count"]
+        )
+        summary["by_priority"][priority] = (
+            summary["by_priority"].get(priority, 0) + group["count"]
+        )
+        summary["overdue"] += group["overdue"]
+        summary["next_deadline"] = earliest(
+            summary["next_deadline"], group["next_deadline"]
+        )
+
+        if priority == URGENT:
+            summary["urgent"] += group["open"]
+            summary["next_urgent_deadline"] = earliest(
+                summary["next_urgent_deadline"], group["next_deadline"]
+            )
+
+    task_is_open = ~Q(task__status=DONE)
+    workload = (
+        Task.assigned_users.through.objects.order_by("customuser")
+        .values("customuser")
+        .annotate(
+            total=Count("task"),
+            open=Count("task", filter=task_is_open),
+            overdue=Count("task", filter=task_is_open & Q(task__due_date__lt=today)),
+        )
+    )
+    summary["assignees"] = [
+        {
+            "user": row["customuser"],
+            "total": row["total"],
+            "open": row["open"],
+            "overdue": row["overdue"],
+        }
+        for row in workload
+    ]
+
+    return summary
+
+
+def earliest(current, candidate):
+    if candidate is None:
+        return current
+
+    return candidate if current is None else min(current, candidate)
+
+
+class BoardSummary:
+    """
+    A computed summary with the TASKS version and the day it is valid for,
+    overdue counts change at midnight without any write.
+    """
+
+    def __init__(self, version, today, data):
+        self.version = version
+        self.today = today
+        self.data = data
+        self.computed_at = time.monotonic()
+
+    def is_current(self, version, today, ttl):
+        return (
+            self.version == version
+            and self.today == today
+            and time.monotonic() - self.computed_at < ttl
+        )
+
+
+_local = None
+
+
+def get_summary(version):
+    """
+    Return the board summary for the current TASKS `version`, computing it
+    only when no cached copy was made at that version and within
+    JOIN_TASK_SUMMARY["TTL"] seconds. Every task write bumps the version,
+    so a write is never answered with a summary from before it.
+
+    The summary is kept per process, or in the cache named by `CACHE_ALIAS`
+    to share it between workers.
+    """
+    global _local
+
+    ttl = get_summary_settings()["TTL"]
+    today = timezone.localdate()
+    shared_cache = get_shared_cache()
+    summary = _local if shared_cache is None else shared_cache.get(DATA_KEY)
+
+    if summary is None or not summary.is_current(version, today, ttl):
+        summary = BoardSummary(version, today, compute_summary(today))
+
+        if shared_cache is not None:
+            shared_cache.set(DATA_KEY, summary, ttl)
+
+    _local = summary
+    return summary
+
+
+def invalidate_summary():
+    global _local
+    _local = None
+
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        shared_cache.delete(DATA_KEY)
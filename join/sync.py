@@ -0,0 +1,95 @@
+import datetime
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.serializers import ValidationError
+
+from .models import Task, TaskTombstone
+from .tokens import delete_in_batches
+
+
+def get_sync_settings():
+    defaults = {"CURSOR_MARGIN": 60, "TOMBSTONE_DAYS": 30}
+    return {**defaults, **getattr(settings, "JOIN_TASK_SYNC", {})}
+
+
+def get_tombstone_cutoff(now=None):
+    days = get_sync_settings()["TOMBSTONE_DAYS"]
+    return (now or timezone.now()) - datetime.timedelta(days=days)
+
+
+def parse_cursor(value):
+    """
+    Parse a sync cursor. An empty cursor means "from the beginning" and is
+    how clients do their first sync. Cursors older than the tombstones kept
+    (JOIN_TASK_SYNC["TOMBSTONE_DAYS"]) are rejected, the client has to sync
+    from the beginning again.
+    """
+    if not value:
+        return None
+
+    try:
+        since = parse_datetime(value)
+    except ValueError:
+        since = None
+
+    if since is None:
+        raise ValidationError({"since": "Invalid sync cursor."})
+
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since, timezone.utc)
+
+    if since < get_tombstone_cutoff():
+        raise ValidationError({"since": "Sync cursor expired, sync from the start."})
+
+    return since
+
+
+def get_task_changes(value):
+    """
+    Return the tasks created or updated and the ids of the tasks deleted
+    since the cursor, plus the cursor for the next sync.
+
+    `updated_at` is set when a write starts, which may commit later than a
+    sync reading after it. The next cursor therefore lies
+    JOIN_TASK_SYNC["CURSOR_MARGIN"] seconds before the query: writes that
+    take less to commit are not lost, and clients receive the tasks
+    changed in that window again, which their merge has to tolerate. The
+    cursor uses "Z" rather than "+00:00" so it survives being put in a
+    query string unencoded.
+    """
+    since = parse_cursor(value)
+    margin = datetime.timedelta(seconds=get_sync_settings()["CURSOR_MARGIN"])
+    cursor = (timezone.now() - margin).isoformat().replace("+00:00", "Z")
+    changed = Task.objects.all()
+    deleted_ids = []
+
+    if since is not None:
+        changed = changed.filter(updated_at__gte=since)
+        deleted_ids = list(
+            TaskTombstone.objects.filter(deleted_at__gte=since)
+            .values_list("task_id", flat=True)
+            .distinct()
+        )
+
+    return changed.order_by("id"), deleted_ids, cursor
+
+
+def purge_tombstones(batch_size=500, pause=0, now=None):
+    """
+    Delete the tombstones older than JOIN_TASK_SYNC["TOMBSTONE_DAYS"], no
+    cursor they could still be sent for is accepted, and return how many
+    there were.
+    """
+    tombstones = TaskTombstone.objects.filter(deleted_at__lt=get_tombstone_cutoff(now))
+
+    def expired_batch(size):
+        # Ids grow with deleted_at, the expired tombstones come first.
+        return list(tombstones.order_by("id").values_list("id", flat=True)[:size])
+
+    def delete_tombstones(ids):
+        deleted, _ = TaskTombstone.objects.filter(id__in=ids).delete()
+        return deleted
+
+    return delete_in_batches(expired_batch, delete_tombstones, batch_size, pause)
@@ -0,0 +1,159 @@
+import base64
+import datetime
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import OperationalError, connections
+from django.db.models import QuerySet
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .test_setup import TestSetup
+from ..models import ArchivedTask, Task, TaskTombstone
+
+
+def days_ago(days):
+    return timezone.now() - datetime.timedelta(days=days)
+
+
+class TestArchive(TestSetup):
+
+    def create_task(self, status, age_days, **fields):
+        resp = self.client.post(self.tasks_url, {**self.dummy_task, **fields})
+        Task.objects.filter(pk=resp.data["id"]).update(
+            status=status, updated_at=days_ago(age_days)
+        )
+        return resp.data["id"]
+
+    def archive(self):
+        out = StringIO()
+        call_command("archive_tasks", "--batch-size", "1", stdout=out)
+        return out.getvalue()
+
+    def test_old_done_tasks_are_archived(self):
+        old_done = self.create_task("done", 100, title="old done")
+        recent_done = self.create_task("done", 10)
+        old_open = self.create_task("todo", 100)
+
+        self.assertIn("Archived 1 task(s)", self.archive())
+
+        board = [task["id"] for task in self.client.get(self.tasks_url).data]
+        self.assertNotIn(old_done, board)
+        self.assertIn(recent_done, board)
+        self.assertIn(old_open, board)
+        self.assertEqual(
+            list(ArchivedTask.objects.values_list("id", flat=True)), [old_done]
+        )
+
+        resp = self.client.get(reverse("archived_task", kwargs={"task_id": old_done}))
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["title"], "old done")
+        self.assertEqual(resp.data["assigned_users"], [1])
+
+        resp = self.client.get(reverse("archived_task", kwargs={"task_id": old_open}))
+        self.assertEqual(resp.status_code, 404)
+
+        # Synced clients drop it like a deleted task.
+        self.assertTrue(TaskTombstone.objects.filter(task_id=old_done).exists())
+
+    def test_archive_list_is_filtered_and_paginated(self):
+        first = self.create_task("done", 300, priority="low")
+        second = self.create_task("done", 200, priority="low")
+        self.create_task("done", 100, priority="high")
+        self.archive()
+        url = reverse("tasks_archive")
+
+        resp = self.client.get(url, {"priority": "low", "limit": 1})
+        self.assertEqual([task["id"] for task in resp.data["results"]], [first])
+
+        resp = self.client.get(
+            url, {"priority": "low", "limit": 1, "cursor": resp.data["next"]}
+        )
+        self.assertEqual([task["id"] for task in resp.data["results"]], [second])
+        self.assertIsNone(resp.data["next"])
+
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(resp.status_code, 304)
+
+    def test_archive_cursor_with_invalid_position_returns_400(self):
+        payload = {"f": "completed_at", "p": "yesterday", "id": 1}
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+
+        resp = self.client.get(reverse("tasks_archive"), {"cursor": cursor})
+
+        self.assertEqual(resp.status_code, 400)
+
+
+# Like ARCHIVE_SQLITE_PATH would configure it, in memory for as long as the
+# connection is open.
+ARCHIVE_DATABASE = {
+    "ENGINE": "join_backend.sqlite3",
+    "NAME": "file:join_test_archive?mode=memory&cache=shared",
+}
+
+
+@override_settings(JOIN_TASK_ARCHIVE={"DATABASE": "archive"})
+class TestSeparateArchive(TestSetup):
+
+    @classmethod
+    def setUpClass(cls):
+        # DATABASES cannot be overridden, the alias is added to the
+        # connections directly and its table created from the model. It is
+        # declared only now, the test runner checks declared aliases first.
+        connections.settings["archive"] = dict(ARCHIVE_DATABASE)
+        with connections["archive"].schema_editor() as editor:
+            editor.create_model(ArchivedTask)
+        cls.databases = {"default", "archive"}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections["archive"].close()
+        del connections["archive"]
+        del connections.settings["archive"]
+
+    def test_tasks_are_archived_to_the_archive_database(self):
+        Task.objects.filter(pk=1).update(status="done", updated_at=days_ago(100))
+
+        out = StringIO()
+        call_command("archive_tasks", stdout=out)
+
+        self.assertIn("Archived 1 task(s)", out.getvalue())
+        self.assertFalse(Task.objects.filter(pk=1).exists())
+        self.assertEqual(
+            list(ArchivedTask.objects.using("archive").values_list("id", flat=True)),
+            [1],
+        )
+        self.assertFalse(ArchivedTask.objects.using("default").exists())
+
+        resp = self.client.get(reverse("archived_task", kwargs={"task_id": 1}))
+        self.assertEqual(resp.data["title"], "dummy task")
+
+    def test_failed_archive_write_keeps_tasks_on_the_board(self):
+        Task.objects.filter(pk=1).update(status="done", updated_at=days_ago(100))
+
+        # The archive insert is the only bulk write of the archival.
+        with mock.patch.object(QuerySet, "bulk_create", side_effect=OperationalError):
+            with self.assertRaises(OperationalError):
+                call_command("archive_tasks", stdout=StringIO())
+
+        self.assertTrue(Task.objects.filter(pk=1).exists())
+
+    def test_failed_archive_commit_keeps_tasks_on_the_board(self):
+        Task.objects.filter(pk=1).update(status="done", updated_at=days_ago(100))
+        archive = connections["archive"]
+
+        # Inside the test transaction the archive block ends with a savepoint
+        # release where it would commit.
+        with mock.patch.object(
+            archive, "savepoint_commit", side_effect=OperationalError
+        ), self.assertRaises(OperationalError):
+            call_command("archive_tasks", stdout=StringIO())
+
+        self.assertTrue(Task.objects.filter(pk=1).exists())
@@ -0,0 +1,38 @@
+from django.db import connection
+from django.test import TestCase
+
+from ..search import FTS_TABLE, fts_enabled
+
+
+class TestDatabase(TestCase):
+
+    def test_sqlite_connections_are_tuned(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite only")
+
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            busy_timeout = cursor.fetchone()[0]
+            cursor.execute("PRAGMA synchronous")
+            synchronous = cursor.fetchone()[0]
+
+        self.assertEqual(busy_timeout, 5000)
+        # 1 is NORMAL
+        self.assertEqual(synchronous, 1)
+
+    def test_contact_search_index_is_kept_in_sync(self):
+        # Migrations that make SQLite rebuild join_contact drop the triggers.
+        if not fts_enabled():
+            self.skipTest("SQLite with FTS5 only")
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger'"
+                " AND tbl_name = 'join_contact'"
+            )
+            triggers = {row[0] for row in cursor.fetchall()}
+
+        self.assertEqual(
+            triggers,
+            {f"{FTS_TABLE}_insert", f"{FTS_TABLE}_delete", f"{FTS_TABLE}_update"},
+        )
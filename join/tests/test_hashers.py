@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.contrib.auth.hashers import identify_hasher
+from django.test import override_settings
+from django.utils.module_loading import import_string
+
+from .test_setup import TestSetup
+from ..models import CustomUser
+
+# As configured, read before TestSetup swaps in the fast test hasher.
+CONFIGURED_HASHERS = settings.PASSWORD_HASHERS
+MD5_HASHER = "django.contrib.auth.hashers.MD5PasswordHasher"
+
+
+class TestHashers(TestSetup):
+
+    @override_settings(PASSWORD_HASHERS=CONFIGURED_HASHERS)
+    def test_registration_uses_configured_hasher(self):
+        data = {**self.user_data, "username": "tuned", "email": "tuned@example.com"}
+
+        resp = self.client.post(self.register_url, data)
+        self.assertEqual(resp.status_code, 201)
+
+        password = CustomUser.objects.get(username="tuned").password
+        self.assertIsInstance(
+            identify_hasher(password), import_string(CONFIGURED_HASHERS[0])
+        )
+
+        resp = self.client.post(self.login_url, data)
+        self.assertEqual(resp.status_code, 200)
+
+    @override_settings(PASSWORD_HASHERS=[*CONFIGURED_HASHERS, MD5_HASHER])
+    def test_login_upgrades_hash_of_other_hasher(self):
+        # The user from setUp was registered with MD5.
+        resp = self.client.post(self.login_url, self.user_data)
+        self.assertEqual(resp.status_code, 200)
+
+        password = CustomUser.objects.get(username="username").password
+        self.assertIsInstance(
+            identify_hasher(password), import_string(CONFIGURED_HASHERS[0])
+        )
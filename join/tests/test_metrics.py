@@ -0,0 +1,59 @@
+import asyncio
+import re
+
+from django.test import AsyncClient
+from django.urls import reverse
+
+from .test_setup import TestSetup
+from ..metrics import registry
+from ..models import CustomUser
+
+
+class TestMetrics(TestSetup):
+
+    def setUp(self):
+        registry.clear()
+        super().setUp()
+
+    def test_views_send_server_timing(self):
+        resp = self.client.get(self.tasks_url)
+
+        self.assertRegex(
+            resp["Server-Timing"], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries"$'
+        )
+
+    async def test_concurrent_asgi_requests_count_their_own_queries(self):
+        client = AsyncClient()
+        headers = {"authorization": f"Token {self.token}"}
+
+        def queries(resp):
+            return re.search(r'"(\d+) queries"', resp["Server-Timing"]).group(1)
+
+        alone = queries(await client.get(self.tasks_url, **headers))
+        responses = await asyncio.gather(
+            *(client.get(self.tasks_url, **headers) for _ in range(4))
+        )
+
+        self.assertEqual([queries(resp) for resp in responses], [alone] * 4)
+
+    def test_metrics_are_admin_only(self):
+        resp = self.client.get(reverse("metrics"))
+
+        self.assertEqual(resp.status_code, 403)
+
+    def test_staff_can_read_metrics(self):
+        user = CustomUser.objects.get(username="username")
+        user.is_staff = True
+        user.save()
+        self.client.get(self.tasks_url)
+
+        resp = self.client.get(reverse("metrics"))
+
+        self.assertEqual(resp.status_code, 200)
+        body = resp.content.decode()
+        self.assertIn(
+            'join_request_duration_seconds_count{view="TaskView",method="GET"} 1',
+            body,
+        )
+        self.assertIn('quantile="0.99"', body)
+        self.assertIn('join_request_queries_total{view="TaskView",method="GET"}', body)
@@ -0,0 +1,63 @@
+from unittest import mock
+
+from django.core import mail
+
+from .test_setup import TestSetup
+from ..models import CustomUser, OutboxEmail
+from ..outbox import deliver_in_background, deliver_pending
+
+
+class TestOutbox(TestSetup):
+
+    def request_password_reset(self):
+        CustomUser.objects.filter(username="username").update(email="user@example.com")
+        return self.client.post("/password_reset/", {"email": "user@example.com"})
+
+    def test_password_reset_queues_email(self):
+        resp = self.request_password_reset()
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.to, ["user@example.com"])
+        self.assertIn("reset-password?token=", email.body)
+
+    def test_outbox_delivers_queued_email(self):
+        self.request_password_reset()
+
+        self.assertEqual(deliver_pending(), 1)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].subject, "Password Reset for Join")
+        self.assertEqual(mail.outbox[0].alternatives[0][1], "text/html")
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.SENT)
+
+    def test_failed_delivery_is_retried_later(self):
+        self.request_password_reset()
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=ConnectionError("SMTP down"),
+        ), self.assertLogs("join.outbox", "WARNING"):
+            self.assertEqual(deliver_pending(), 0)
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertEqual(email.last_error, "SMTP down")
+        # Not due yet, so nothing is sent
+        self.assertEqual(deliver_pending(), 0)
+
+    def test_background_delivery_schedules_the_retry(self):
+        self.request_password_reset()
+
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=ConnectionError("SMTP down"),
+        ), mock.patch("threading.Timer") as timer, self.assertLogs("join.outbox"):
+            deliver_in_background()
+
+        delay = timer.call_args.args[0]
+        self.assertAlmostEqual(delay, 60, delta=5)
+        self.assertEqual(timer.call_args.kwargs["args"], [deliver_in_background])
+        timer.return_value.start.assert_called_once_with()
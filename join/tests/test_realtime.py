@@ -0,0 +1,71 @@
+import json
+
+from asgiref.sync import async_to_sync, sync_to_async
+from asgiref.testing import ApplicationCommunicator
+
+from .test_setup import TestSetup
+from join_backend.asgi import application
+
+
+class TestRealtime(TestSetup):
+
+    def post_task(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.tasks_url, self.dummy_task)
+
+    def make_scope(self, scope_type, path, token):
+        return {
+            "type": scope_type,
+            "path": path,
+            "query_string": f"token={token}".encode(),
+            "headers": [],
+        }
+
+    @async_to_sync
+    async def receive_websocket_event(self, token):
+        communicator = ApplicationCommunicator(
+            application, self.make_scope("websocket", "/ws/tasks/", token)
+        )
+        await communicator.send_input({"type": "websocket.connect"})
+        accepted = await communicator.receive_output(timeout=1)
+        if accepted["type"] != "websocket.accept":
+            return accepted
+
+        await sync_to_async(self.post_task)()
+        event = await communicator.receive_output(timeout=1)
+        await communicator.send_input({"type": "websocket.disconnect", "code": 1000})
+        await communicator.wait(timeout=1)
+        return event
+
+    @async_to_sync
+    async def receive_server_sent_event(self):
+        communicator = ApplicationCommunicator(
+            application, self.make_scope("http", "/events/tasks/", self.token)
+        )
+        start = await communicator.receive_output(timeout=1)
+
+        await sync_to_async(self.post_task)()
+        body = await communicator.receive_output(timeout=1)
+        await communicator.send_input({"type": "http.disconnect"})
+        await communicator.wait(timeout=1)
+        return start, body
+
+    def test_websocket_receives_task_events(self):
+        event = self.receive_websocket_event(self.token)
+
+        payload = json.loads(event["text"])
+        self.assertEqual(payload["type"], "task.created")
+        self.assertEqual(payload["task"]["title"], "dummy task")
+
+    def test_websocket_rejects_invalid_token(self):
+        event = self.receive_websocket_event("invalid")
+
+        self.assertEqual(event, {"type": "websocket.close", "code": 4401})
+
+    def test_server_sent_events_receive_task_events(self):
+        start, body = self.receive_server_sent_event()
+
+        self.assertEqual(start["status"], 200)
+        self.assertTrue(body["body"].startswith(b"data: "))
+        payload = json.loads(body["body"][len(b"data: "):])
+        self.assertEqual(payload["type"], "task.created")
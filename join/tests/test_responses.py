@@ -0,0 +1,55 @@
+import datetime
+import gzip
+import json
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+
+from .test_setup import TestSetup
+from ..renderers import FastJSONRenderer
+
+
+class TestResponses(TestSetup):
+
+    def test_fast_renderer_matches_json_renderer(self):
+        data = {
+            "title": "café  ",
+            "due": datetime.date(2024, 5, 6),
+            "at": datetime.datetime(
+                2024, 5, 6, 12, 30, 1, 123456, tzinfo=datetime.timezone.utc
+            ),
+            "amount": Decimal("1.50"),
+            "ids": [1, 2.5, None, True],
+        }
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_fast_renderer_floats_decode_to_the_same_value(self):
+        data = {"floats": [1e16, 0.1, -2.5e-8, 123456789.125]}
+
+        self.assertEqual(
+            json.loads(FastJSONRenderer().render(data)),
+            json.loads(JSONRenderer().render(data)),
+        )
+
+    def test_large_responses_are_compressed(self):
+        for index in range(30):
+            task = {**self.dummy_task, "title": f"Task {index}"}
+            self.client.post(self.tasks_url, task)
+
+        plain = self.client.get(self.tasks_url)
+        resp = self.client.get(self.tasks_url, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", resp["Vary"])
+        self.assertEqual(json.loads(gzip.decompress(resp.content)), plain.json())
+
+        resp = self.client.get(
+            self.tasks_url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=resp["ETag"]
+        )
+        self.assertEqual(resp.status_code, 304)
+
+    def test_small_responses_are_not_compressed(self):
+        resp = self.client.get(self.categorys_url, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertFalse(resp.has_header("Content-Encoding"))
@@ -1,12 +1,24 @@
 from rest_framework.test import APITestCase
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from ..authentication import local_cache
+from ..catalogue import invalidate_catalogue
 from ..models import Category, Task
+from ..summary import invalidate_summary
 
 
+# Every test registers and logs in a user, a deliberately slow hasher only
+# costs time there. TestHashers covers the configured ones.
+@override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
 class TestSetup(APITestCase):
 
     def setUp(self):
+        local_cache.clear()
+        invalidate_catalogue()
+        invalidate_summary()
         self.register_url = reverse("register")
         self.login_url = reverse("login")
         self.logout_url = reverse("logout")
@@ -65,5 +77,24 @@ class TestSetup(APITestCase):
 
         return super().setUp()
 
+    def count_queries(self, method, url, **kwargs):
+        with CaptureQueriesContext(connection) as queries:
+            resp = getattr(self.client, method)(url, **kwargs)
+
+        self.assertLess(resp.status_code, 400)
+        return len(queries)
+
+    def assertQueryBudget(self, budget, add_rows, method, url, **kwargs):
+        """
+        Assert a request runs at most `budget` queries and that the count
+        stays the same after `add_rows()` has grown the table.
+        """
+        before = self.count_queries(method, url, **kwargs)
+        add_rows()
+        after = self.count_queries(method, url, **kwargs)
+
+        self.assertLessEqual(before, budget)
+        self.assertEqual(before, after, "query count grows with row count")
+
     def tearDown(self):
         return super().tearDown()
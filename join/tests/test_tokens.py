@@ -0,0 +1,105 @@
+import datetime
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from django_rest_passwordreset.models import ResetPasswordToken
+from rest_framework.authtoken.models import Token
+
+from .test_setup import TestSetup
+from .. import tokens
+from ..authentication import local_cache
+from ..models import CustomUser, TokenActivity
+
+
+def days_ago(days):
+    return timezone.now() - datetime.timedelta(days=days)
+
+
+class TestTokens(TestSetup):
+
+    def age_token(self, days):
+        TokenActivity.objects.filter(token_id=self.token).update(
+            last_seen=days_ago(days)
+        )
+        local_cache.clear()
+
+    def test_idle_token_expires(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.age_token(15)
+
+        resp = self.client.get(reverse("check_auth"))
+
+        self.assertEqual(resp.status_code, 401)
+        self.assertFalse(Token.objects.filter(key=self.token).exists())
+
+    def test_last_seen_writes_are_coalesced(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.age_token(1)
+
+        self.client.get(reverse("check_auth"))
+        last_seen = TokenActivity.objects.get(token_id=self.token).last_seen
+        self.assertGreater(last_seen, days_ago(1 / 24))
+
+        with self.assertNumQueries(0):
+            resp = self.client.get(reverse("check_auth"))
+        self.assertEqual(resp.status_code, 200)
+
+    def test_login_replaces_expired_token(self):
+        self.age_token(15)
+
+        resp = self.client.post(self.login_url, self.user_data)
+
+        self.assertNotEqual(resp.data["token"], self.token)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {resp.data['token']}")
+        self.assertEqual(self.client.get(reverse("check_auth")).status_code, 200)
+
+    def test_purge_tokens_deletes_expired_tokens(self):
+        idle = Token.objects.create(
+            user=CustomUser.objects.create_user("idle", "idle@example.com", "pw")
+        )
+        TokenActivity.objects.create(token=idle, last_seen=days_ago(30))
+        untracked = Token.objects.create(
+            user=CustomUser.objects.create_user("old", "old@example.com", "pw")
+        )
+        Token.objects.filter(pk=untracked.pk).update(created=days_ago(30))
+
+        user = CustomUser.objects.get(username="username")
+        expired_reset = ResetPasswordToken.objects.create(user=user)
+        ResetPasswordToken.objects.filter(pk=expired_reset.pk).update(
+            created_at=days_ago(2)
+        )
+        fresh_reset = ResetPasswordToken.objects.create(user=user)
+
+        out = StringIO()
+        call_command("purge_tokens", "--batch-size", "1", stdout=out)
+
+        self.assertIn("Deleted 2 expired auth token(s)", out.getvalue())
+        self.assertEqual(list(Token.objects.values_list("key", flat=True)), [self.token])
+        self.assertEqual(
+            list(ResetPasswordToken.objects.values_list("pk", flat=True)),
+            [fresh_reset.pk],
+        )
+
+    def test_purge_keeps_token_used_after_it_was_selected(self):
+        self.age_token(30)
+        delete_in_batches = tokens.delete_in_batches
+
+        def touch_selected(select_batch, delete_batch, *args):
+            def select_then_touch(size):
+                keys = select_batch(size)
+                # The owner makes a request before the batch is deleted.
+                TokenActivity.objects.filter(token_id__in=keys).update(
+                    last_seen=timezone.now()
+                )
+                return keys
+
+            return delete_in_batches(select_then_touch, delete_batch, *args)
+
+        with mock.patch.object(tokens, "delete_in_batches", touch_selected):
+            deleted = tokens.purge_auth_tokens()
+
+        self.assertEqual(deleted, 0)
+        self.assertTrue(Token.objects.filter(key=self.token).exists())
@@ -1,6 +1,34 @@
+import base64
+import datetime
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import caches
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
 from .test_setup import TestSetup
 from django.urls import reverse
-from ..models import Task
+from ..authentication import (
+    CachedTokenAuthentication,
+    local_cache,
+    shared_cache_key,
+)
+from ..catalogue import CategoryCatalogue, get_catalogue
+from ..models import Category, CustomUser, Subtask, Task, TaskTombstone
+from ..async_views import AsyncAPIView
+from ..views import TaskView, UserListView, LoginView
+from join_backend.serializers import (
+    TaskSerializer,
+    UserListSerializer,
+    ContactSerializer,
+)
 
 
 class TestViews(TestSetup):
@@ -60,6 +88,81 @@ class TestViews(TestSetup):
         self.assertEqual(resp.status_code, 200)
         self.assertIn("id", resp.data)
 
+    def test_task_patch_writes_only_changed_fields(self):
+        other = CustomUser.objects.create_user("other", "other@example.com", "pw")
+        Task.objects.filter(pk=1).update(author=other)
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.patch(
+                self.single_tasks_url, {"status": "done", "priority": "high"}
+            )
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["author"], other.pk)
+        updates = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith('UPDATE "join_task"')
+        ]
+        self.assertEqual(len(updates), 1)
+        written = updates[0].split(" SET ")[1].split(" WHERE ")[0]
+        self.assertEqual(
+            sorted(column.split(" = ")[0] for column in written.split(", ")),
+            ['"status"', '"updated_at"', '"version"'],
+        )
+
+    def test_subtask_only_patch_changes_task_list_etag(self):
+        etag = self.client.get(self.tasks_url)["ETag"]
+
+        resp = self.client.patch(
+            self.single_tasks_url,
+            {"subtasks": [{"title": "step", "complete": False}]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 200)
+
+        resp = self.client.get(self.tasks_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data[0]["subtasks"][0]["title"], "step")
+
+    def test_stale_task_patch_returns_412(self):
+        etag = self.client.get(self.tasks_url).data[0]["version"]
+        etag = f'"{etag}"'
+
+        resp = self.client.patch(
+            self.single_tasks_url, {"status": "done"}, HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+
+        resp = self.client.patch(
+            self.single_tasks_url, {"priority": "low"}, HTTP_IF_MATCH=etag
+        )
+        self.assertEqual(resp.status_code, 412)
+        self.assertEqual(resp.data["task"]["status"], "done")
+
+        resp = self.client.patch(
+            self.single_tasks_url, {"priority": "low", "version": 1}, format="json"
+        )
+        self.assertEqual(resp.status_code, 412)
+        self.assertEqual(Task.objects.get(pk=1).priority, "high")
+
+    def test_form_encoded_task_version_is_accepted(self):
+        version = Task.objects.get(pk=1).version
+
+        resp = self.client.patch(self.single_tasks_url, {"version": "x"})
+        self.assertEqual(resp.status_code, 400)
+
+        resp = self.client.patch(
+            self.single_tasks_url, {"priority": "low", "version": str(version + 1)}
+        )
+        self.assertEqual(resp.status_code, 412)
+
+        resp = self.client.patch(
+            self.single_tasks_url, {"priority": "low", "version": str(version)}
+        )
+        self.assertEqual(resp.status_code, 200)
+
     def test_user_can_delete_task(self):
         self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
         resp = self.client.delete(self.single_tasks_url, self.dummy_task)
@@ -96,3 +199,620 @@ class TestViews(TestSetup):
 
         self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp.data["message"], "logout successful")
+
+    def test_user_can_filter_tasks(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.client.post(self.tasks_url, {**self.dummy_task, "status": "done"})
+
+        resp = self.client.get(self.tasks_url, {"status": "done"})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.data), 1)
+        self.assertEqual(resp.data[0]["status"], "done")
+
+    def test_user_can_paginate_tasks_with_cursor(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        for due_date in ["2024-05-01", "2024-05-06", "2024-05-09"]:
+            self.client.post(self.tasks_url, {**self.dummy_task, "due_date": due_date})
+
+        seen = []
+        params = {"limit": 2}
+        while True:
+            resp = self.client.get(self.tasks_url, params)
+            self.assertEqual(resp.status_code, 200)
+            seen += [(task["due_date"], task["id"]) for task in resp.data["results"]]
+            if resp.data["next"] is None:
+                break
+            params = {"limit": 2, "cursor": resp.data["next"]}
+
+        self.assertEqual(len(seen), Task.objects.count())
+        self.assertEqual(seen, sorted(seen))
+
+    def test_invalid_task_cursor_returns_400(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        resp = self.client.get(self.tasks_url, {"cursor": "not-a-cursor"})
+
+        self.assertEqual(resp.status_code, 400)
+
+        for position, pk in [
+            ("zzz", 1),
+            (None, 1),
+            ([1], 1),
+            ("2024-13-01", 1),
+            ("2024-05-06", 2**63),
+        ]:
+            payload = {"f": "due_date", "p": position, "id": pk}
+            cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+            resp = self.client.get(self.tasks_url, {"cursor": cursor})
+            self.assertEqual(resp.status_code, 400, position)
+
+    def test_out_of_range_filter_id_returns_400(self):
+        resp = self.client.get(self.tasks_url, {"category": "99999999999999999999"})
+
+        self.assertEqual(resp.status_code, 400)
+
+    def create_assigned_tasks(self, count=10):
+        for _ in range(count):
+            self.client.post(self.tasks_url, self.dummy_task)
+
+    def test_task_list_query_count_is_constant(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+
+        self.assertQueryBudget(4, self.create_assigned_tasks, "get", self.tasks_url)
+
+    def test_paginated_task_list_query_count_is_constant(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+
+        self.assertQueryBudget(
+            4, self.create_assigned_tasks, "get", self.tasks_url, data={"limit": 5}
+        )
+
+    def assertSameContent(self, view, attribute, serializer_class, method, url, **kwargs):
+        fast = getattr(self.client, method)(url, **kwargs)
+        with mock.patch.object(view, attribute, serializer_class):
+            slow = getattr(self.client, method)(url, **kwargs)
+
+        self.assertEqual(fast.status_code, slow.status_code)
+        self.assertEqual(fast.content, slow.content)
+
+    def test_values_serializers_match_model_serializers(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.create_assigned_tasks(3)
+        self.client.post(self.tasks_url, {**self.dummy_task, "assigned_users": []})
+        self.client.post(
+            self.tasks_url,
+            {**self.dummy_task, "subtasks": [{"title": "a"}, {"title": "b"}]},
+            format="json",
+        )
+
+        self.assertSameContent(
+            TaskView, "list_serializer_class", TaskSerializer, "get", self.tasks_url
+        )
+        self.assertSameContent(
+            TaskView,
+            "list_serializer_class",
+            TaskSerializer,
+            "get",
+            self.tasks_url,
+            data={"limit": 2},
+        )
+        self.assertSameContent(
+            UserListView,
+            "list_serializer_class",
+            UserListSerializer,
+            "get",
+            self.user_list_url,
+        )
+        self.assertSameContent(
+            LoginView,
+            "contact_serializer_class",
+            ContactSerializer,
+            "post",
+            self.login_url,
+            data=self.user_data,
+        )
+
+    def test_unchanged_lists_return_304(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+
+        # The categories come from the cached catalogue.
+        urls = [(self.tasks_url, 1), (self.categorys_url, 0), (self.user_list_url, 1)]
+
+        for url, queries in urls:
+            etag = self.client.get(url)["ETag"]
+            with self.assertNumQueries(queries):
+                resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+            self.assertEqual(resp.status_code, 304)
+            self.assertEqual(resp["ETag"], etag)
+
+    def test_task_write_changes_etag(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        etag = self.client.get(self.tasks_url)["ETag"]
+        self.client.patch(self.single_tasks_url, {"status": "done"})
+
+        resp = self.client.get(self.tasks_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp["ETag"], etag)
+
+    def test_async_views_are_sync_under_wsgi(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+
+        with mock.patch.object(AsyncAPIView, "adispatch") as adispatch:
+            resp = self.client.get(reverse("check_auth"))
+
+        self.assertEqual(resp.status_code, 200)
+        adispatch.assert_not_called()
+
+    async def test_async_views_under_asgi(self):
+        client = AsyncClient()
+        # AsyncClient sends extra keyword arguments as headers.
+        headers = {"authorization": f"Token {self.token}"}
+        adispatch = mock.patch.object(
+            AsyncAPIView, "adispatch", autospec=True, side_effect=AsyncAPIView.adispatch
+        )
+
+        for url in [
+            reverse("check_auth"),
+            self.categorys_url,
+            self.user_list_url,
+            self.tasks_url,
+        ]:
+            with adispatch as dispatched:
+                resp = await client.get(url, **headers)
+            self.assertEqual(resp.status_code, 200, url)
+            dispatched.assert_called_once()
+
+        resp = await client.get(reverse("check_auth"))
+        self.assertEqual(resp.status_code, 401)
+
+        resp = await client.patch(
+            self.single_tasks_url,
+            json.dumps({"status": "done"}),
+            content_type="application/json",
+            **headers,
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.json()["status"], "done")
+
+    def test_user_can_list_tasks_assigned_to_them(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.client.post(self.tasks_url, {**self.dummy_task, "assigned_users": []})
+
+        resp = self.client.get(self.tasks_url, {"assigned_to": "me"})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([task["id"] for task in resp.data], [1])
+        resp = self.client.get(self.tasks_url, {"assigned_to": "someone"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_user_tasks_include_counts(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.client.post(self.tasks_url, {**self.dummy_task, "status": "done"})
+        self.client.post(self.tasks_url, {**self.dummy_task, "assigned_users": []})
+        user_tasks_url = reverse("user_tasks", kwargs={"user_id": 1})
+
+        resp = self.client.get(user_tasks_url)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["counts"], {"todo": 1, "done": 1})
+        self.assertEqual(len(resp.data["tasks"]), 2)
+        self.assertQueryBudget(4, self.create_assigned_tasks, "get", user_tasks_url)
+
+        resp = self.client.get(reverse("user_tasks", kwargs={"user_id": 99}))
+        self.assertEqual(resp.status_code, 404)
+
+    def test_task_summary_counts_tasks(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.client.post(
+            self.tasks_url,
+            {**self.dummy_task, "priority": "urgent", "due_date": "2999-01-02"},
+        )
+        self.client.post(
+            self.tasks_url,
+            {**self.dummy_task, "status": "done", "priority": "urgent"},
+        )
+
+        resp = self.client.get(reverse("tasks_summary"))
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["total"], 3)
+        self.assertEqual(resp.data["by_status"], {"todo": 2, "done": 1})
+        self.assertEqual(resp.data["by_priority"], {"high": 1, "urgent": 2})
+        self.assertEqual(resp.data["urgent"], 1)
+        self.assertEqual(resp.data["overdue"], 1)
+        self.assertEqual(str(resp.data["next_urgent_deadline"]), "2999-01-02")
+        self.assertEqual(
+            resp.data["assignees"], [{"user": 1, "total": 3, "open": 2, "overdue": 1}]
+        )
+
+    def test_task_summary_is_cached_until_a_task_write(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        summary_url = reverse("tasks_summary")
+        self.client.get(summary_url)
+
+        # Only the version lookup.
+        with self.assertNumQueries(1):
+            self.client.get(summary_url)
+
+        self.client.patch(self.single_tasks_url, {"status": "done"})
+        resp = self.client.get(summary_url)
+
+        self.assertEqual(resp.data["by_status"], {"done": 1})
+        self.assertEqual(resp.data["overdue"], 0)
+
+    def test_login_omits_unchanged_contacts(self):
+        etag = self.client.post(self.login_url, self.user_data)["ETag"]
+
+        resp = self.client.post(
+            self.login_url, self.user_data, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertIsNone(resp.data["contacts"])
+
+        self.client.post(self.contacts_url, self.dummy_contact)
+        resp = self.client.post(
+            self.login_url, self.user_data, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(len(resp.data["contacts"]), 2)
+
+    def test_user_can_sync_task_changes(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        resp = self.client.get(self.tasks_url, {"since": ""})
+        self.assertEqual(len(resp.data["changed"]), 1)
+        cursor = resp.data["cursor"]
+
+        # Changes within the cursor margin are sent again.
+        resp = self.client.get(self.tasks_url, {"since": cursor})
+        self.assertEqual([task["id"] for task in resp.data["changed"]], [1])
+
+        new_task = self.client.post(self.tasks_url, self.dummy_task).data
+        self.client.delete(self.single_tasks_url)
+
+        resp = self.client.get(self.tasks_url, {"since": cursor})
+        self.assertEqual([task["id"] for task in resp.data["changed"]], [new_task["id"]])
+        self.assertEqual(resp.data["deleted"], [1])
+
+    def test_invalid_sync_cursor_returns_400(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        resp = self.client.get(self.tasks_url, {"since": "yesterday"})
+
+        self.assertEqual(resp.status_code, 400)
+
+    @override_settings(JOIN_TASK_SYNC={"CURSOR_MARGIN": 0})
+    def test_sync_without_margin_skips_sent_changes(self):
+        cursor = self.client.get(self.tasks_url, {"since": ""}).data["cursor"]
+
+        resp = self.client.get(self.tasks_url, {"since": cursor})
+        self.assertEqual(resp.data["changed"], [])
+
+    def days_ago(self, days):
+        return timezone.now() - datetime.timedelta(days=days)
+
+    def test_expired_sync_cursor_returns_400(self):
+        since = self.days_ago(31).isoformat()
+
+        resp = self.client.get(self.tasks_url, {"since": since})
+
+        self.assertEqual(resp.status_code, 400)
+
+    def test_purge_tombstones_deletes_old_tombstones(self):
+        self.client.delete(self.single_tasks_url)
+        TaskTombstone.objects.update(deleted_at=self.days_ago(31))
+        TaskTombstone.objects.create(task_id=2)
+
+        out = StringIO()
+        call_command("purge_tombstones", "--batch-size", "1", stdout=out)
+
+        self.assertIn("Deleted 1 tombstone(s)", out.getvalue())
+        tombstones = TaskTombstone.objects.values_list("task_id", flat=True)
+        self.assertEqual(list(tombstones), [2])
+
+    def test_authentication_is_cached(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+
+        with self.assertNumQueries(0):
+            resp = self.client.get(reverse("check_auth"))
+
+        self.assertEqual(resp.status_code, 200)
+
+    @override_settings(JOIN_TOKEN_CACHE={"CACHE_ALIAS": "default"})
+    def test_shared_cache_invalidation_reaches_every_process(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.assertEqual(self.client.get(reverse("check_auth")).status_code, 200)
+
+        # The user is deactivated in another process: the shared entry is
+        # dropped, this process still holds a local copy.
+        credentials = CachedTokenAuthentication().load_credentials(self.token)
+        local_cache.set(self.token, credentials)
+        CustomUser.objects.update(is_active=False)
+        caches["default"].delete(shared_cache_key(self.token))
+
+        resp = self.client.get(reverse("check_auth"))
+
+        self.assertEqual(resp.status_code, 401)
+
+    def test_logout_invalidates_cached_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.client.post(self.logout_url)
+
+        resp = self.client.get(reverse("check_auth"))
+
+        self.assertEqual(resp.status_code, 401)
+
+    def test_delete_user_invalidates_cached_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        Task.objects.all().delete()
+        self.client.delete("/delete_user/")
+
+        resp = self.client.get(reverse("check_auth"))
+
+        self.assertEqual(resp.status_code, 401)
+
+    def test_user_can_bulk_write_tasks(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        second = self.client.post(self.tasks_url, self.dummy_task).data
+        new_task = {**self.dummy_task, "assigned_users": [1]}
+
+        resp = self.client.post(
+            reverse("tasks_bulk"),
+            {
+                "create": [new_task, new_task],
+                "update": [{"id": 1, "status": "done", "assigned_users": []}],
+                "delete": [second["id"]],
+            },
+            format="json",
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([r["status"] for r in resp.data["created"]], [201, 201])
+        self.assertEqual(resp.data["created"][0]["task"]["assigned_users"], [1])
+        self.assertEqual(resp.data["updated"][0]["task"]["status"], "done")
+        self.assertEqual(resp.data["updated"][0]["task"]["assigned_users"], [])
+        self.assertEqual(resp.data["deleted"], [{"id": second["id"], "status": 204}])
+        self.assertEqual(Task.objects.count(), 3)
+
+    def test_invalid_bulk_item_rolls_back_batch(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+
+        resp = self.client.post(
+            reverse("tasks_bulk"),
+            {
+                "create": [self.dummy_task],
+                "update": [{"id": 999, "status": "done"}],
+            },
+            format="json",
+        )
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertEqual(resp.data["updated"][0]["status"], 404)
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_bulk_rejects_repeated_task_ids(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+
+        for payload in (
+            {"update": [{"id": 1, "status": "done"}], "delete": [1]},
+            {"update": [{"id": 1, "status": "done"}, {"id": 1, "priority": "low"}]},
+            {"delete": [1, 1]},
+        ):
+            resp = self.client.post(reverse("tasks_bulk"), payload, format="json")
+            self.assertEqual(resp.status_code, 400)
+
+        self.assertEqual(Task.objects.get(pk=1).status, "todo")
+
+    def test_bulk_rejects_booleans_as_ids(self):
+        url = reverse("tasks_bulk")
+
+        for payload in (
+            {"delete": [True]},
+            {"delete": [2**63]},
+            {"update": [{"id": True, "status": "done"}]},
+            {"update": [{"id": 1, "assigned_users": [True]}]},
+        ):
+            resp = self.client.post(url, payload, format="json")
+            self.assertEqual(resp.status_code, 400, payload)
+
+        task = Task.objects.get(pk=1)
+        self.assertEqual(task.status, "todo")
+        self.assertEqual(list(task.assigned_users.values_list("pk", flat=True)), [1])
+
+    def test_stale_bulk_update_returns_412(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        self.client.patch(self.single_tasks_url, {"status": "done"})
+
+        resp = self.client.post(
+            reverse("tasks_bulk"),
+            {"update": [{"id": 1, "status": "todo", "version": 1}]},
+            format="json",
+        )
+
+        self.assertEqual(resp.status_code, 412)
+        self.assertEqual(resp.data["updated"][0]["status"], 412)
+        self.assertEqual(Task.objects.get(pk=1).status, "done")
+
+    def test_bulk_update_version_is_parsed_like_a_patch(self):
+        url = reverse("tasks_bulk")
+        version = Task.objects.get(pk=1).version
+
+        resp = self.client.post(
+            url, {"update": [{"id": 1, "version": "x"}]}, format="json"
+        )
+        self.assertEqual(resp.status_code, 400)
+
+        # Nothing changes, the version stays for other clients' If-Match.
+        resp = self.client.post(
+            url,
+            {"update": [{"id": 1, "status": "todo", "version": str(version)}]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(Task.objects.get(pk=1).version, version)
+
+        resp = self.client.post(
+            url,
+            {"update": [{"id": 1, "status": "done", "version": str(version)}]},
+            format="json",
+        )
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(Task.objects.get(pk=1).version, version + 1)
+
+    def test_failed_subtask_insert_creates_no_task(self):
+        task = {**self.dummy_task, "subtasks": [{"title": "one"}]}
+
+        with mock.patch.object(
+            Subtask.objects, "bulk_create", side_effect=DatabaseError
+        ), self.assertRaises(DatabaseError):
+            self.client.post(self.tasks_url, task, format="json")
+
+        self.assertEqual(Task.objects.count(), 1)
+
+    def test_task_subtasks_are_stored_with_counters(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        subtasks = [{"title": "one", "complete": True}, {"title": "two"}]
+
+        resp = self.client.post(
+            self.tasks_url, {**self.dummy_task, "subtasks": subtasks}, format="json"
+        )
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertEqual([s["title"] for s in resp.data["subtasks"]], ["one", "two"])
+        self.assertEqual(resp.data["subtasks_done"], 1)
+        self.assertEqual(resp.data["subtasks_total"], 2)
+
+    def test_user_can_toggle_single_subtask(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token}")
+        subtasks_url = reverse("subtasks", kwargs={"task_id": 1})
+        subtask = self.client.post(subtasks_url, {"title": "one"}).data
+
+        resp = self.client.patch(
+            reverse("single_subtask", kwargs={"task_id": 1, "subtask_id": subtask["id"]}),
+            {"complete": True},
+        )
+
+        self.assertEqual(resp.status_code, 200)
+        task = Task.objects.get(pk=1)
+        self.assertEqual((task.subtasks_done, task.subtasks_total), (1, 1))
+
+        self.client.delete(
+            reverse("single_subtask", kwargs={"task_id": 1, "subtask_id": subtask["id"]})
+        )
+        task.refresh_from_db()
+        self.assertEqual((task.subtasks_done, task.subtasks_total), (0, 0))
+
+    def test_duplicate_email_is_rejected_in_one_query(self):
+        data = {**self.user_data, "username": "other"}
+
+        with self.assertNumQueries(1):
+            resp = self.client.post(self.register_url, data)
+
+        self.assertEqual(resp.status_code, 409)
+        self.assertEqual(resp.data["message"], "This email already exists")
+
+    def test_registration_without_username_returns_400(self):
+        data = {**self.user_data, "username": "", "email": "new@example.com"}
+
+        resp = self.client.post(self.register_url, data)
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertFalse(CustomUser.objects.filter(email="new@example.com").exists())
+
+    def test_user_can_be_imported_from_file(self):
+        users = [
+            {**self.user_data, "username": "new", "email": "new@example.com"},
+            {**self.user_data, "username": "taken", "email": "email"},
+            {**self.user_data, "username": "new", "email": "dup@example.com"},
+        ]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "users.json"
+            path.write_text(json.dumps(users))
+            call_command("import_users", str(path), stdout=StringIO())
+
+        user = CustomUser.objects.get(username="new")
+        self.assertTrue(user.check_password("password"))
+        self.assertFalse(CustomUser.objects.filter(username="taken").exists())
+
+    def test_lean_login_reuses_token_and_skips_contacts(self):
+        resp = self.client.post(f"{self.login_url}?contacts=false", self.user_data)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["token"], self.token)
+        self.assertNotIn("contacts", resp.data)
+
+    def test_user_can_page_through_contacts(self):
+        self.client.post(self.contacts_url, {**self.dummy_contact, "name": "Alice"})
+
+        resp = self.client.get(self.contacts_url, {"limit": 1})
+        self.assertEqual([c["name"] for c in resp.data["results"]], ["Alice"])
+
+        resp = self.client.get(self.contacts_url, {"cursor": resp.data["next"]})
+        self.assertEqual([c["name"] for c in resp.data["results"]], ["John Doe"])
+        self.assertIsNone(resp.data["next"])
+
+        resp = self.client.get(self.contacts_url, HTTP_IF_NONE_MATCH=resp["ETag"])
+        self.assertEqual(resp.status_code, 200)
+        etag = resp["ETag"]
+        resp = self.client.get(self.contacts_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+    def test_user_can_search_contacts(self):
+        alice = {**self.dummy_contact, "name": "Alice", "email": "alice@example.com"}
+        self.client.post(self.contacts_url, alice)
+        self.client.patch(
+            reverse("contacts_with_id", kwargs={"contact_id": 1}),
+            {**self.dummy_contact, "name": "Johanna Doe"},
+        )
+
+        resp = self.client.get(self.contacts_url, {"search": "joh"})
+        self.assertEqual([c["name"] for c in resp.data], ["Johanna Doe"])
+
+        with self.settings(JOIN_CONTACT_SEARCH={"FTS": False}):
+            resp = self.client.get(self.contacts_url, {"search": "lic"})
+        self.assertEqual([c["name"] for c in resp.data], ["Alice"])
+
+    def test_seed_join_creates_board(self):
+        call_command(
+            "seed_join", tasks=30, users=4, contacts=10, batch_size=7, verbosity=0
+        )
+
+        tasks = Task.objects.filter(title__startswith="Task ")
+        self.assertEqual(tasks.count(), 30)
+        self.assertEqual(CustomUser.objects.filter(username__startswith="seed").count(), 4)
+        task = tasks.first()
+        self.assertEqual(task.assigned_users.count(), 3)
+        self.assertEqual(task.subtask_set.count(), task.subtasks_total)
+
+        resp = self.client.get(self.tasks_url)
+        self.assertEqual(len(resp.data), 31)
+
+    def test_task_creation_reads_category_from_catalogue(self):
+        self.client.get(self.categorys_url)
+
+        with CaptureQueriesContext(connection) as queries:
+            resp = self.client.post(self.tasks_url, self.dummy_task)
+
+        self.assertEqual(resp.status_code, 201)
+        self.assertFalse([q for q in queries if "join_category" in q["sql"]])
+
+        resp = self.client.post(self.tasks_url, {**self.dummy_task, "category": 99})
+        self.assertEqual(resp.status_code, 400)
+
+        self.client.post(self.categorys_url, {"name": "new", "color": "#fff"})
+        resp = self.client.get(self.categorys_url)
+        self.assertEqual(len(resp.data), 2)
+
+    @override_settings(JOIN_CATEGORY_CACHE={"CACHE_ALIAS": "default"})
+    def test_category_written_while_loading_catalogue_is_not_lost(self):
+        load = CategoryCatalogue.load
+
+        def load_then_write():
+            catalogue = load()
+            # Another process adds a category and drops the shared version.
+            Category.objects.create(name="new", color="#fff")
+            return catalogue
+
+        with mock.patch.object(CategoryCatalogue, "load", side_effect=load_then_write):
+            get_catalogue()
+
+        self.assertEqual(len(get_catalogue().data), 2)
@@ -0,0 +1,159 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django_rest_passwordreset.models import (
+    ResetPasswordToken,
+    get_password_reset_token_expiry_time,
+)
+from rest_framework.authtoken.models import Token
+
+from .models import TokenActivity
+
+
+def get_expiry_settings():
+    defaults = {"IDLE_TIMEOUT": 14 * 24 * 3600, "TOUCH_INTERVAL": 300}
+    return {**defaults, **getattr(settings, "JOIN_TOKEN_EXPIRY", {})}
+
+
+def get_last_seen(token):
+    """
+    When the token was last used, as loaded with it by the authentication.
+    Tokens without an activity row count from their creation.
+    """
+    return getattr(token, "last_seen", None) or token.created
+
+
+def get_cutoff(now=None):
+    """
+    Tokens not used since the returned time are expired, None if tokens
+    never expire.
+    """
+    idle_timeout = get_expiry_settings()["IDLE_TIMEOUT"]
+    if idle_timeout is None:
+        return None
+
+    return (now or timezone.now()) - datetime.timedelta(seconds=idle_timeout)
+
+
+def is_expired(token, now):
+    cutoff = get_cutoff(now)
+    return cutoff is not None and get_last_seen(token) < cutoff
+
+
+def touch_due(token, now):
+    interval = datetime.timedelta(seconds=get_expiry_settings()["TOUCH_INTERVAL"])
+    return now - get_last_seen(token) >= interval
+
+
+def touch_token(token, now):
+    """
+    Slide the token's expiry window. The UPDATE only matches when the
+    stored `last_seen` is older than the touch interval, so processes that
+    raced to the same touch write once.
+    """
+    interval = datetime.timedelta(seconds=get_expiry_settings()["TOUCH_INTERVAL"])
+    updated = TokenActivity.objects.filter(
+        token_id=token.key, last_seen__lte=now - interval
+    ).update(last_seen=now)
+
+    if not updated:
+        TokenActivity.objects.get_or_create(
+            token_id=token.key, defaults={"last_seen": now}
+        )
+
+    # The token may be the cached instance, later requests see the touch.
+    token.last_seen = now
+
+
+def start_session(key):
+    """
+    Restart the expiry window of a token on login.
+    """
+    now = timezone.now()
+    if not TokenActivity.objects.filter(token_id=key).update(last_seen=now):
+        TokenActivity.objects.get_or_create(token_id=key, defaults={"last_seen": now})
+
+
+def expired_token_filter(cutoff):
+    return Q(activity__last_seen__lt=cutoff) | Q(
+        activity__isnull=True, created__lt=cutoff
+    )
+
+
+def delete_in_batches(select_batch, delete_batch, batch_size, pause):
+    """
+    Delete rows `batch_size` at a time until `select_batch` finds no more.
+    Every batch is its own short write, so the table is never locked for
+    long, and `pause` seconds between batches let other writers in.
+
+    `delete_batch` returns how many rows it deleted, fewer than selected if
+    some changed in between.
+    """
+    deleted = 0
+
+    while True:
+        pks = select_batch(batch_size)
+        if not pks:
+            return deleted
+
+        deleted += delete_batch(pks)
+
+        if pause:
+            time.sleep(pause)
+
+
+def purge_auth_tokens(batch_size=500, pause=0, now=None):
+    """
+    Delete the auth tokens idle for longer than JOIN_TOKEN_EXPIRY
+    ["IDLE_TIMEOUT"] and return how many there were.
+    """
+    cutoff = get_cutoff(now)
+    if cutoff is None:
+        return 0
+
+    def idle_batch(size):
+        # Walks the last_seen index from the oldest activity.
+        activity = TokenActivity.objects.filter(last_seen__lt=cutoff)
+        activity = activity.order_by("last_seen").values_list("token", flat=True)
+        return list(activity[:size])
+
+    def untracked_batch(size):
+        tokens = Token.objects.filter(activity__isnull=True, created__lt=cutoff)
+        return list(tokens.values_list("key", flat=True)[:size])
+
+    def delete_tokens(keys):
+        # Through the ORM so the auth cache drops them (see signals). Tokens
+        # used since they were selected are no longer expired.
+        tokens = Token.objects.filter(expired_token_filter(cutoff), key__in=keys)
+        _, deleted = tokens.delete()
+        return deleted.get(Token._meta.label, 0)
+
+    deleted = delete_in_batches(idle_batch, delete_tokens, batch_size, pause)
+    deleted += delete_in_batches(untracked_batch, delete_tokens, batch_size, pause)
+    return deleted
+
+
+def purge_reset_tokens(batch_size=500, pause=0, now=None):
+    """
+    Delete the password reset tokens older than
+    DJANGO_REST_MULTITOKENAUTH_RESET_TOKEN_EXPIRY_TIME hours and return how
+    many there were.
+    """
+    cutoff = (now or timezone.now()) - datetime.timedelta(
+        hours=get_password_reset_token_expiry_time()
+    )
+    tokens = ResetPasswordToken.objects.filter(created_at__lte=cutoff)
+
+    def expired_batch(size):
+        # Ids grow with created_at, so in primary key order the expired
+        # tokens come first and no index on created_at is needed.
+        return list(tokens.order_by("id").values_list("id", flat=True)[:size])
+
+    def delete_tokens(ids):
+        _, deleted = ResetPasswordToken.objects.filter(id__in=ids).delete()
+        return deleted.get(ResetPasswordToken._meta.label, 0)
+
+    return delete_in_batches(expired_batch, delete_tokens, batch_size, pause)
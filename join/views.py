@@ -1,12 +1,49 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Max, Q
+from django.http import Http404, HttpResponse
 from django.shortcuts import render, get_object_or_404
-
-from .models import Task, Category, CustomUser, Contact
+from django.utils import timezone
+
+from .models import ArchivedTask, Task, CustomUser, Contact, Subtask
+from .async_views import AsyncAPIView
+from .authentication import CachedTokenAuthentication, get_or_create_token
+from .bulk import TaskBulkOperation
+from .catalogue import aget_catalogue, get_catalogue
+from .etags import (
+    ARCHIVE,
+    CATEGORIES,
+    TASKS,
+    USERS,
+    bump_version,
+    contacts_scope,
+    etag_matches,
+    get_expected_versions,
+    get_versions,
+    make_etag,
+    not_modified,
+    precondition_failed,
+    version_etag,
+)
+from .events import TASK_CREATED, TASK_DELETED, TASK_UPDATED, publish_task_event
+from .filters import (
+    assigned_task_ids,
+    filter_archived_tasks,
+    filter_contacts,
+    filter_tasks,
+)
+from .metrics import registry
+from .pagination import ArchivePagination, ContactPagination, KeysetPagination
+from .summary import get_summary
+from .sync import get_task_changes
 from join_backend.serializers import (
     TaskSerializer,
     CategorySerializer,
-    UserListSerializer,
     ContactSerializer,
     UserSerializer,
+    SubtaskSerializer,
+    TaskValuesSerializer,
+    UserListValuesSerializer,
+    ContactValuesSerializer,
 )
 
 from rest_framework.serializers import ValidationError
@@ -15,11 +52,13 @@ from rest_framework import status
 from rest_framework.authtoken.views import ObtainAuthToken, APIView
 from rest_framework.authtoken.models import Token
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 
 
 class LoginView(ObtainAuthToken):
+    contact_serializer_class = ContactValuesSerializer
+
     """
     Handles POST requests for user login.
 
@@ -28,28 +67,41 @@ class LoginView(ObtainAuthToken):
 
     Returns:
         Response: JSON response containing authentication token, user data, and contact information.
+                  The `ETag` header identifies the contact list; when the request's
+                  `If-None-Match` still matches it, `contacts` is null and the client
+                  keeps its cached copy. With `contacts=false` only the token and user
+                  are returned and the contacts are loaded from `contacts/`.
     """
 
     def post(self, request, *args, **kwargs):
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data["user"]
-        token, created = Token.objects.get_or_create(user=user)
-        contacts = ContactSerializer(user.contacts.all(), many=True).data
-        user_data = UserSerializer(user).data
+        data = {"token": get_or_create_token(user), "user": UserSerializer(user).data}
 
-        return Response(
-            {
-                "token": token.key,
-                "user": user_data,
-                "contacts": contacts,
-            },
-            status=status.HTTP_200_OK,
-        )
+        if not self.include_contacts(request):
+            return Response(data, status=status.HTTP_200_OK)
+
+        etag = make_etag(request, contacts_scope(user.pk))
+
+        if etag_matches(request, etag):
+            data["contacts"] = None
+        else:
+            data["contacts"] = self.contact_serializer_class(
+                user.contacts.all(), many=True
+            ).data
+
+        response = Response(data, status=status.HTTP_200_OK)
+        response["ETag"] = etag
+        return response
+
+    def include_contacts(self, request):
+        value = request.query_params.get("contacts", request.data.get("contacts"))
+        return str(value).lower() not in ("false", "0", "no")
 
 
 class LogoutView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     """
@@ -71,8 +123,8 @@ class LogoutView(APIView):
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
-class checkAuth(APIView):
-    authentication_classes = [TokenAuthentication]
+class checkAuth(AsyncAPIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     """
@@ -88,22 +140,87 @@ class checkAuth(APIView):
 
         return Response({"message": "Authenticated"}, status=status.HTTP_200_OK)
 
+    async def aget(self, request):
+        return self.get(request)
 
-class TaskView(APIView):
-    authentication_classes = [TokenAuthentication]
+
+class MetricsView(APIView):
+    authentication_classes = [CachedTokenAuthentication, SessionAuthentication]
+    permission_classes = [IsAdminUser]
+
+    """
+    Per-view request metrics of this process in the Prometheus text format,
+    for staff users only.
+
+    Returns:
+    - HttpResponse: Latency quantiles, SQL query counts and time and response
+      sizes recorded by PerformanceMiddleware.
+    """
+
+    def get(self, request):
+        return HttpResponse(
+            registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+        )
+
+
+class TaskView(AsyncAPIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    list_serializer_class = TaskValuesSerializer
 
     """
-    Get a list of all tasks.
+    Get a list of tasks, optionally filtered by status, priority, category,
+    assigned users (`assigned_to=me` for the requesting user's) and due
+    date range.
+
+    Passing `limit` or `cursor` switches to keyset pagination ordered by
+    `ordering` (`due_date` or `status`) and id.
+
+    Passing `since` (empty for the first sync) returns only the tasks
+    changed since that cursor, the ids of deleted tasks and the next cursor.
+
+    Answers `If-None-Match` with 304 while no task has changed.
 
     Returns:
-        Response: JSON response containing serialized task data.
+        Response: JSON response containing serialized task data, a page
+                  with `results` and the `next` cursor when paginated, or
+                  `changed`, `deleted` and `cursor` when syncing.
     """
 
     def get(self, request):
-        tasks = Task.objects.all()
-        serializer = TaskSerializer(tasks, many=True)
-        return Response(serializer.data)
+        etag = make_etag(request, TASKS)
+
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        if "since" in request.query_params:
+            response = self.get_changes(request)
+            response["ETag"] = etag
+            return response
+
+        tasks = filter_tasks(Task.objects.all(), request.query_params, request.user)
+        tasks = self.list_serializer_class.setup_eager_loading(tasks)
+
+        if KeysetPagination.is_requested(request):
+            paginator = KeysetPagination(request)
+            page = paginator.paginate_queryset(tasks)
+            serializer = self.list_serializer_class(page, many=True)
+            response = paginator.get_paginated_response(serializer.data)
+        else:
+            serializer = self.list_serializer_class(tasks, many=True)
+            response = Response(serializer.data)
+
+        response["ETag"] = etag
+        return response
+
+    def get_changes(self, request):
+        changed, deleted, cursor = get_task_changes(request.query_params["since"])
+        changed = self.list_serializer_class.setup_eager_loading(changed)
+        serializer = self.list_serializer_class(changed, many=True)
+
+        return Response(
+            {"changed": serializer.data, "deleted": deleted, "cursor": cursor}
+        )
 
     """
     Create a new task.
@@ -117,45 +234,65 @@ class TaskView(APIView):
         serializer = TaskSerializer(data=request.data)
 
         if serializer.is_valid():
-            category_id = request.data.get("category")
-            category = get_object_or_404(Category, pk=category_id)
+            # Resolved by the serializer from the category catalogue.
+            category = serializer.validated_data.get("category")
+            if category is None:
+                raise Http404
             assigned_user_ids = request.data.get("assigned_users", [])
             assigned_users = CustomUser.objects.filter(pk__in=assigned_user_ids)
 
-            task = serializer.save(
-                author=request.user,
-                assigned_users=assigned_users,
-                category=category,
-            )
+            # The task, its assignees and subtasks are committed together.
+            with transaction.atomic():
+                task = serializer.save(
+                    author=request.user,
+                    assigned_users=assigned_users,
+                    category=category,
+                )
+            publish_task_event(TASK_CREATED, task=serializer.data)
 
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            response = Response(serializer.data, status=status.HTTP_201_CREATED)
+            response["ETag"] = version_etag(task.version)
+            return response
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     """
-    Update a single task.
+    Update a single task. Only the changed fields are written; the author
+    stays the one who created the task.
+
+    The update can be made conditional on the version the client last saw,
+    with `If-Match` (the task's ETag) or a `version` field. A task changed
+    since then is not written and the response is 412 with the current task.
 
     Args:
         request: HTTP request object.
         task_id: ID of the task to be updated.
     Returns:
 
-        Response: JSON response containing updated task data if successful,
-                  otherwise error messages.
+        Response: JSON response containing updated task data and its ETag if
+                  successful, otherwise error messages.
     """
 
     def patch(self, request, task_id):
-        task = get_object_or_404(Task, pk=task_id)
-        serializer = TaskSerializer(instance=task, data=request.data, partial=True)
+        expected = get_expected_versions(request)
 
-        if serializer.is_valid():
-            serializer.save(
-                author=request.user,
-            )
+        # The row stays locked from the version check to the write.
+        with transaction.atomic():
+            task = get_object_or_404(Task.objects.select_for_update(), pk=task_id)
 
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            if expected is not None and task.version not in expected:
+                return precondition_failed(TaskSerializer(task).data, task.version)
 
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+            serializer = TaskSerializer(instance=task, data=request.data, partial=True)
+            if not serializer.is_valid():
+                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+            serializer.save()
+            publish_task_event(TASK_UPDATED, task=serializer.data)
+
+        response = Response(serializer.data, status=status.HTTP_200_OK)
+        response["ETag"] = version_etag(task.version)
+        return response
 
     """
     Delete a single task.
@@ -171,18 +308,273 @@ class TaskView(APIView):
     def delete(self, request, task_id):
         task = get_object_or_404(Task, pk=task_id)
         task.delete()
+        publish_task_event(TASK_DELETED, task_id=task_id)
 
         return Response(
             {"message": "Task deleted successfully"}, status=status.HTTP_204_NO_CONTENT
         )
 
 
-class CategorysView(APIView):
-    authentication_classes = [TokenAuthentication]
+class UserTaskView(AsyncAPIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+    list_serializer_class = TaskValuesSerializer
+
+    """
+    Get the tasks assigned to one user, for their personal board, found
+    through the assignment table's user index. Accepts the filters of the
+    task list.
+
+    Answers `If-None-Match` with 304 while no task has changed.
+
+    Args:
+        request: HTTP request object.
+        user_id: ID of the assigned user.
+
+    Returns:
+        Response: JSON response with the `user` id, the `tasks` and the
+                  number of them per status in `counts`.
+    """
+
+    def get(self, request, user_id):
+        etag = make_etag(request, TASKS)
+
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        tasks = Task.objects.filter(id__in=assigned_task_ids([user_id]))
+        tasks = filter_tasks(tasks, request.query_params, request.user)
+        tasks = self.list_serializer_class.setup_eager_loading(tasks)
+        data = self.list_serializer_class(tasks, many=True).data
+
+        # Only an empty board needs to tell a missing user from an idle one.
+        if not data and not CustomUser.objects.filter(pk=user_id).exists():
+            raise Http404
+
+        counts = {}
+        for task in data:
+            counts[task["status"]] = counts.get(task["status"], 0) + 1
+
+        response = Response({"user": user_id, "counts": counts, "tasks": data})
+        response["ETag"] = etag
+        return response
+
+
+class TaskSummaryView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    """
+    Board summary computed in the database: task counts per status and
+    priority, open urgent and overdue tasks, the next open deadline and the
+    workload of every assignee.
+
+    Answers `If-None-Match` with 304 while no task has changed on the same
+    day.
+
+    Returns:
+        Response: JSON response with `total`, `by_status`, `by_priority`,
+                  `urgent`, `overdue`, `next_deadline`,
+                  `next_urgent_deadline` and `assignees`.
+    """
+
+    def get(self, request):
+        (version,) = get_versions(TASKS)
+        today = timezone.localdate()
+        etag = make_etag(request, TASKS, "day", versions=[version, today])
+
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        response = Response(get_summary(version).data)
+        response["ETag"] = etag
+        return response
+
+
+class ArchivedTaskView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    """
+    Get archived tasks, the done tasks moved off the board by
+    `archive_tasks`, as they were when archived. The list accepts the
+    `priority`, `category` and due date filters of the task list and is
+    paginated by cursor, ordered by `completed_at` or `due_date`.
+
+    Answers `If-None-Match` with 304 until the next archival.
+
+    Args:
+        request: HTTP request object.
+        task_id: ID of a single archived task, optional.
+
+    Returns:
+        Response: JSON response with a page of archived tasks in `results`
+                  and the `next` cursor, or a single archived task.
+    """
+
+    def get(self, request, task_id=None):
+        etag = make_etag(request, ARCHIVE)
+
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        if task_id is not None:
+            archived = ArchivedTask.objects.filter(pk=task_id)
+            data = archived.values_list("data", flat=True).first()
+            if data is None:
+                raise Http404
+            response = Response(data)
+        else:
+            archived = filter_archived_tasks(
+                ArchivedTask.objects.all(), request.query_params
+            )
+            paginator = ArchivePagination(request)
+            page = paginator.paginate_queryset(
+                archived.values("id", paginator.field, "data")
+            )
+            response = paginator.get_paginated_response([row["data"] for row in page])
+
+        response["ETag"] = etag
+        return response
+
+
+class TaskBulkView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    """
+    Create, partially update and delete many tasks in one transaction.
+
+    Expects a JSON object with optional `create` (task objects), `update`
+    (task objects with `id`) and `delete` (task ids) lists. A task id may
+    appear only once across `update` and `delete`.
+
+    Update items may carry the `version` they were based on. An update of a
+    task changed by someone else since then fails with 412.
+
+    Returns:
+        Response: JSON response with a result per item under `created`,
+                  `updated` and `deleted`. If any item is invalid nothing is
+                  written and the response is 400, or 412 if all failures
+                  are version conflicts.
+    """
+
+    def post(self, request):
+        if not isinstance(request.data, dict):
+            return Response(
+                {"error": "Expected a JSON object."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        operation = TaskBulkOperation(request.user, request.data)
+        errors = operation.get_payload_errors()
+
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        # Nothing can change the tasks between their validation and the write.
+        with transaction.atomic():
+            if not operation.validate():
+                return Response(
+                    operation.results, status=operation.get_error_status()
+                )
+
+            return Response(operation.execute(), status=status.HTTP_200_OK)
+
+
+class SubtaskView(APIView):
+    authentication_classes = [CachedTokenAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    """
+    Add a subtask to the end of a task's list.
+
+    Args:
+        request: HTTP request object.
+        task_id: ID of the task.
+
+    Returns:
+        Response: JSON response containing the created subtask data.
+    """
+
+    def post(self, request, task_id):
+        task = get_object_or_404(Task, pk=task_id)
+        serializer = SubtaskSerializer(data=request.data)
+
+        if serializer.is_valid():
+            last = task.subtask_set.aggregate(last=Max("position"))["last"]
+            position = 0 if last is None else last + 1
+            serializer.save(task=task, position=position)
+            self.task_changed(task_id)
+
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    """
+    Update a single subtask, e.g. to tick it off.
+
+    Args:
+        request: HTTP request object.
+        task_id: ID of the task.
+        subtask_id: ID of the subtask to be updated.
+
+    Returns:
+        Response: JSON response containing the updated subtask data.
+    """
+
+    def patch(self, request, task_id, subtask_id):
+        subtask = get_object_or_404(Subtask, pk=subtask_id, task_id=task_id)
+        serializer = SubtaskSerializer(instance=subtask, data=request.data, partial=True)
+
+        if serializer.is_valid():
+            serializer.save()
+            self.task_changed(task_id)
+
+            return Response(serializer.data, status=status.HTTP_200_OK)
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    """
+    Delete a single subtask.
+
+    Args:
+        request: HTTP request object.
+        task_id: ID of the task.
+        subtask_id: ID of the subtask to be deleted.
+
+    Returns:
+        Response: JSON response indicating success of the operation.
+    """
+
+    def delete(self, request, task_id, subtask_id):
+        subtask = get_object_or_404(Subtask, pk=subtask_id, task_id=task_id)
+        subtask.delete()
+        self.task_changed(task_id)
+
+        return Response(
+            {"message": "Subtask deleted successfully"},
+            status=status.HTTP_204_NO_CONTENT,
+        )
+
+    def task_changed(self, task_id):
+        """
+        Recount the task's progress counters and notify clients.
+        """
+        tasks = Task.objects.filter(pk=task_id)
+        tasks.refresh_subtask_counters()
+        bump_version(TASKS)
+        publish_task_event(TASK_UPDATED, task=TaskValuesSerializer(tasks).data[0])
+
+
+class CategorysView(AsyncAPIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     """
-    Retrieve all categories.
+    Retrieve all categories from the cached category catalogue.
+
+    Answers `If-None-Match` with 304 while no category has changed.
 
     Args:
         request: HTTP request object.
@@ -192,9 +584,20 @@ class CategorysView(APIView):
     """
 
     def get(self, request):
-        categorys = Category.objects.all()
-        serializer = CategorySerializer(categorys, many=True)
-        return Response(serializer.data)
+        return self.list_categories(request, get_catalogue())
+
+    async def aget(self, request):
+        return self.list_categories(request, await aget_catalogue())
+
+    def list_categories(self, request, catalogue):
+        etag = make_etag(request, CATEGORIES, versions=[catalogue.version])
+
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        response = Response(catalogue.data)
+        response["ETag"] = etag
+        return response
 
     """
     Create a new category.
@@ -236,35 +639,66 @@ class CreateUserView(APIView):
         initials = request.data.get("initials")
         color = request.data.get("color")
 
-        if CustomUser.objects.filter(username=username).exists():
+        if not username:
             return Response(
-                {"message": "This username already exists"},
-                status=status.HTTP_409_CONFLICT,
+                {"message": "The given username must be set"},
+                status=status.HTTP_400_BAD_REQUEST,
             )
 
-        if CustomUser.objects.filter(email=email).exists():
-            return Response(
-                {"message": "This email already exists"},
-                status=status.HTTP_409_CONFLICT,
-            )
+        conflict = self.get_conflict(username, email)
+        if conflict:
+            return conflict
 
-        user = CustomUser.objects.create_user(
-            username=username,
+        user = CustomUser(
+            username=CustomUser.normalize_username(username),
             first_name=first_name,
             last_name=last_name,
-            email=email,
-            password=password,
+            email=CustomUser.objects.normalize_email(email),
             initials=initials,
             color=color,
         )
+        # Hash outside the transaction, it would hold the write lock for as
+        # long as the hasher takes.
+        user.set_password(password)
+
+        try:
+            with transaction.atomic():
+                user.save()
+        except IntegrityError:
+            # Another request registered the same name or email in between.
+            return self.get_conflict(username, email) or Response(
+                {"message": "This user already exists"},
+                status=status.HTTP_409_CONFLICT,
+            )
 
         return Response(
             {"message": "User created successfully"}, status=status.HTTP_201_CREATED
         )
 
+    def get_conflict(self, username, email):
+        """
+        Check username and email in one query, before paying for hashing the
+        password. The unique constraints catch anything that slips through.
+        """
+        taken = CustomUser.objects.filter(Q(username=username) | Q(email=email))
+
+        for existing_username in taken.values_list("username", flat=True)[:2]:
+            if existing_username == username:
+                return Response(
+                    {"message": "This username already exists"},
+                    status=status.HTTP_409_CONFLICT,
+                )
+
+            return Response(
+                {"message": "This email already exists"},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return None
+
 
 class DeleteUserView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     """
@@ -286,13 +720,16 @@ class DeleteUserView(APIView):
         )
 
 
-class UserListView(APIView):
-    authentication_classes = [TokenAuthentication]
+class UserListView(AsyncAPIView):
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    list_serializer_class = UserListValuesSerializer
 
     """
     Retrieve a list of all users.
 
+    Answers `If-None-Match` with 304 while no user has changed.
+
     Args:
         request: HTTP request object.
         
@@ -301,15 +738,59 @@ class UserListView(APIView):
     """
 
     def get(self, request):
-        users = CustomUser.objects.all()
-        serializer = UserListSerializer(users, many=True)
+        etag = make_etag(request, USERS)
+
+        if etag_matches(request, etag):
+            return not_modified(etag)
 
-        return Response(serializer.data)
+        users = CustomUser.objects.all()
+        serializer = self.list_serializer_class(users, many=True)
+        response = Response(serializer.data)
+        response["ETag"] = etag
+        return response
 
 
 class ContactView(APIView):
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
+    list_serializer_class = ContactValuesSerializer
+
+    """
+    Get the contacts of the current user, or a single contact.
+
+    `search` narrows the list by name, e-mail or phone number. Passing
+    `limit` or `cursor` switches to keyset pagination ordered by name and
+    id. Answers `If-None-Match` with 304 while the contacts are unchanged.
+
+    Returns:
+        Response: JSON response containing the serialized contacts, or a page
+                  with `results` and the `next` cursor when paginated.
+    """
+
+    def get(self, request, contact_id=None):
+        if contact_id is not None:
+            contact = get_object_or_404(request.user.contacts, pk=contact_id)
+            return Response(ContactSerializer(contact).data)
+
+        etag = make_etag(request, contacts_scope(request.user.pk))
+
+        if etag_matches(request, etag):
+            return not_modified(etag)
+
+        contacts = filter_contacts(request.user.contacts.all(), request.query_params)
+        contacts = self.list_serializer_class.setup_eager_loading(contacts)
+
+        if ContactPagination.is_requested(request):
+            paginator = ContactPagination(request)
+            page = paginator.paginate_queryset(contacts)
+            serializer = self.list_serializer_class(page, many=True)
+            response = paginator.get_paginated_response(serializer.data)
+        else:
+            serializer = self.list_serializer_class(contacts, many=True)
+            response = Response(serializer.data)
+
+        response["ETag"] = etag
+        return response
 
     """
     Handles POST requests to create a new contact.
@@ -13,4 +13,9 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'join_backend.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported once Django is set up, it needs the app registry.
+from join.realtime import RealtimeRouter  # noqa: E402
+
+application = RealtimeRouter(django_application)
@@ -1,16 +1,106 @@
+from django.db.models.query import QuerySet
 from rest_framework import serializers
-from join.models import Task, Category, CustomUser, Contact
+from rest_framework.relations import ManyRelatedField
+from join.catalogue import get_category
+from join.models import Task, Category, CustomUser, Contact, Subtask
+from join.subtasks import replace_subtasks
+
+
+class SubtaskSerializer(serializers.ModelSerializer):
+    """
+    Serializer for Subtask model.
+    """
+
+    class Meta:
+        model = Subtask
+        fields = ["id", "title", "complete"]
+
+
+class CategoryField(serializers.PrimaryKeyRelatedField):
+    """
+    Category reference resolved through the cached category catalogue.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+        category = get_category(pk)
+        if category is None:
+            self.fail("does_not_exist", pk_value=data)
+
+        return category
 
 
 class TaskSerializer(serializers.ModelSerializer):
     """
     Serializer for Task model.
+
+    Subtasks are nested; writing `subtasks` replaces the task's whole list.
     """
 
+    subtasks = SubtaskSerializer(many=True, required=False, source="subtask_set")
+    category = CategoryField(queryset=Category.objects.all(), required=False)
+
     class Meta:
         model = Task
         fields = "__all__"
-        read_only_fields = ["author", "assigned_users"]
+        read_only_fields = [
+            "author",
+            "assigned_users",
+            "subtasks_done",
+            "subtasks_total",
+            "version",
+        ]
+
+    def create(self, validated_data):
+        subtasks = validated_data.pop("subtask_set", None)
+        task = super().create(validated_data)
+        self.save_subtasks(task, subtasks)
+        return task
+
+    def update(self, instance, validated_data):
+        """
+        Write only the fields whose value changed and bump the version.
+        Saving with `update_fields` leaves columns changed concurrently by
+        other requests alone.
+        """
+        subtasks = validated_data.pop("subtask_set", None)
+        fields = instance.apply_changes(validated_data)
+
+        if fields:
+            instance.version += 1
+            instance.save(update_fields=[*fields, "version", "updated_at"])
+
+        self.save_subtasks(instance, subtasks)
+        return instance
+
+    def save_subtasks(self, task, subtasks):
+        if subtasks is None:
+            return
+
+        replace_subtasks({task.pk: subtasks})
+        task.refresh_from_db(
+            fields=["subtasks_done", "subtasks_total", "updated_at", "version"]
+        )
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        return queryset.for_list()
+
+
+class TaskBulkSerializer(TaskSerializer):
+    """
+    Serializer for items of bulk task writes. The category is validated as a
+    plain id so a batch checks all categories in one query.
+    """
+
+    category = serializers.IntegerField(source="category_id", required=False)
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -59,3 +149,174 @@ class ContactSerializer(serializers.ModelSerializer):
     class Meta:
         model = Contact
         fields = ["id", "name", "email", "phone", "initials", "color"]
+
+
+class ValuesSerializer:
+    """
+    Read-only list serializer that builds dicts straight from `.values()` rows.
+
+    The output fields, their order and their representation are taken from
+    `model_serializer`, so responses are byte-identical to it, but the
+    per-row field introspection of a ModelSerializer is skipped. Many-to-many
+    fields are resolved with one query on the through table and nested
+    reverse relations (e.g. subtasks) with one query on the related table.
+    """
+
+    model_serializer = None
+
+    # Field types whose database value is already its JSON representation.
+    passthrough_fields = (
+        serializers.BooleanField,
+        serializers.CharField,
+        serializers.IntegerField,
+        serializers.JSONField,
+        serializers.PrimaryKeyRelatedField,
+    )
+
+    _layout = None
+
+    def __init__(self, instance, many=True):
+        self.instance = instance
+
+    @classmethod
+    def build_layout(cls, serializer):
+        """
+        Describe how to build a serializer's output from `.values()` rows:
+        the output field names, the columns to select, the value converters,
+        the many-to-many fields and the nested list serializers.
+        """
+        layout = {
+            "model": serializer.Meta.model,
+            "names": [],
+            "columns": [],
+            "converters": {},
+            "many_to_many": [],
+            "nested": {},
+        }
+
+        for name, field in serializer.fields.items():
+            layout["names"].append(name)
+
+            if isinstance(field, ManyRelatedField):
+                layout["many_to_many"].append(name)
+            elif isinstance(field, serializers.ListSerializer):
+                layout["nested"][name] = (field.source, cls.build_layout(field.child))
+            else:
+                layout["columns"].append(name)
+                if not isinstance(field, cls.passthrough_fields):
+                    layout["converters"][name] = field.to_representation
+
+        return layout
+
+    @classmethod
+    def get_layout(cls):
+        """
+        Inspect `model_serializer` once per class.
+        """
+        if cls.__dict__.get("_layout") is None:
+            cls._layout = cls.build_layout(cls.model_serializer())
+
+        return cls._layout
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        return queryset.values(*cls.get_layout()["columns"])
+
+    def get_many_to_many(self, model, name, ids):
+        """
+        Map each row id to the ordered list of related ids for field `name`.
+        """
+        field = model._meta.get_field(name)
+        source = f"{field.m2m_field_name()}_id"
+        target = f"{field.m2m_reverse_field_name()}_id"
+        related = {pk: [] for pk in ids}
+
+        if not ids:
+            return related
+
+        pairs = (
+            field.remote_field.through.objects.filter(**{f"{source}__in": ids})
+            .order_by(source, target)
+            .values_list(source, target)
+        )
+        for pk, related_pk in pairs:
+            related[pk].append(related_pk)
+
+        return related
+
+    def get_nested(self, model, source, layout, ids):
+        """
+        Map each row id to the serialized objects of the reverse relation
+        `source`, in the related model's default ordering.
+        """
+        rel = getattr(model, source).rel
+        related = {pk: [] for pk in ids}
+
+        if not ids:
+            return related
+
+        rows = list(
+            rel.related_model.objects.filter(**{f"{rel.field.name}__in": ids}).values(
+                rel.field.attname, *layout["columns"]
+            )
+        )
+        parents = [row[rel.field.attname] for row in rows]
+
+        for pk, item in zip(parents, self.serialize(layout, rows)):
+            related[pk].append(item)
+
+        return related
+
+    def serialize(self, layout, rows):
+        names, converters = layout["names"], layout["converters"]
+        ids = [row["id"] for row in rows]
+        related = {
+            name: self.get_many_to_many(layout["model"], name, ids)
+            for name in layout["many_to_many"]
+        }
+        for name, (source, nested_layout) in layout["nested"].items():
+            related[name] = self.get_nested(layout["model"], source, nested_layout, ids)
+
+        data = []
+        for row in rows:
+            for name, convert in converters.items():
+                if row[name] is not None:
+                    row[name] = convert(row[name])
+            for name, values in related.items():
+                row[name] = values[row["id"]]
+            data.append({name: row[name] for name in names})
+
+        return data
+
+    @property
+    def data(self):
+        rows = self.instance
+
+        if isinstance(rows, QuerySet) and rows._fields is None:
+            rows = self.setup_eager_loading(rows)
+
+        return self.serialize(self.get_layout(), list(rows))
+
+
+class TaskValuesSerializer(ValuesSerializer):
+    """
+    Fast read-only counterpart of TaskSerializer.
+    """
+
+    model_serializer = TaskSerializer
+
+
+class UserListValuesSerializer(ValuesSerializer):
+    """
+    Fast read-only counterpart of UserListSerializer.
+    """
+
+    model_serializer = UserListSerializer
+
+
+class ContactValuesSerializer(ValuesSerializer):
+    """
+    Fast read-only counterpart of ContactSerializer.
+    """
+
+    model_serializer = ContactSerializer
@@ -12,6 +12,10 @@ https://docs.djangoproject.com/en/4.0/ref/settings/
 
 import os
 from pathlib import Path
+
+import django
+from corsheaders.defaults import default_headers
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -50,6 +54,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
+    "join.middleware.PerformanceMiddleware",
+    "join.middleware.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -84,11 +90,74 @@ WSGI_APPLICATION = "join_backend.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/4.0/ref/settings/#databases
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+# DB_ENGINE selects the profile: "sqlite" (default) or "postgres".
+
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "postgres":
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.getenv("POSTGRES_DB", "join"),
+            "USER": os.getenv("POSTGRES_USER", "join"),
+            "PASSWORD": os.getenv("POSTGRES_PASSWORD", ""),
+            "HOST": os.getenv("POSTGRES_HOST", "localhost"),
+            "PORT": os.getenv("POSTGRES_PORT", "5432"),
+            # Persistent connections
+            "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+            "OPTIONS": {},
+        }
+    }
+
+    # Checked before reuse, from Django 4.1 on
+    if django.VERSION >= (4, 1):
+        DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+    # Server-side pool (Django >= 5.1 with psycopg[pool]), replaces
+    # persistent connections
+    if os.getenv("DB_POOL", "false").lower() == "true":
+        if django.VERSION < (5, 1):
+            raise ImproperlyConfigured("DB_POOL needs Django 5.1 or later.")
+
+        DATABASES["default"]["CONN_MAX_AGE"] = 0
+        DATABASES["default"]["OPTIONS"]["pool"] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+        }
+else:
+    DATABASES = {
+        "default": {
+            # django.db.backends.sqlite3 plus the pragmas below
+            "ENGINE": os.getenv("SQLITE_ENGINE", "join_backend.sqlite3"),
+            "NAME": os.getenv("SQLITE_PATH") or BASE_DIR / "db.sqlite3",
+            "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+        }
     }
+
+# ARCHIVE_SQLITE_PATH keeps the task archive (see JOIN_TASK_ARCHIVE) in its
+# own SQLite file; create it with `python manage.py migrate --database archive`.
+
+if os.getenv("ARCHIVE_SQLITE_PATH"):
+    DATABASES["archive"] = {
+        "ENGINE": os.getenv("SQLITE_ENGINE", "join_backend.sqlite3"),
+        "NAME": os.getenv("ARCHIVE_SQLITE_PATH"),
+        "CONN_MAX_AGE": int(os.getenv("DB_CONN_MAX_AGE", "60")),
+    }
+
+DATABASE_ROUTERS = ["join.archive.ArchiveRouter"]
+
+# Applied to every new SQLite connection (see join_backend/sqlite3). WAL lets
+# readers run during a write; it needs a local file system, set
+# SQLITE_JOURNAL_MODE=DELETE on network storage. The journal mode is stored
+# in the database file, so the db.sqlite3 checked into the repository keeps
+# its rollback journal unless asked otherwise; deployments set SQLITE_PATH.
+
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv(
+        "SQLITE_JOURNAL_MODE", "WAL" if os.getenv("SQLITE_PATH") else "DELETE"
+    ),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "5000")),
 }
 
 
@@ -111,6 +180,36 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing
+# PASSWORD_HASHER picks the hasher for new passwords: "pbkdf2" (default),
+# "argon2" (needs argon2-cffi) or "scrypt". The others stay enabled so
+# existing hashes still verify and are upgraded on the next login.
+
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2")
+
+PASSWORD_HASHER_CLASSES = {
+    "pbkdf2": "join.hashers.TunedPBKDF2PasswordHasher",
+    "argon2": "join.hashers.TunedArgon2PasswordHasher",
+    "scrypt": "join.hashers.TunedScryptPasswordHasher",
+}
+
+PASSWORD_HASHERS = [PASSWORD_HASHER_CLASSES[PASSWORD_HASHER]] + [
+    path for name, path in PASSWORD_HASHER_CLASSES.items() if name != PASSWORD_HASHER
+]
+
+PASSWORD_HASHING = {
+    key: int(os.environ[key])
+    for key in [
+        "PBKDF2_ITERATIONS",
+        "ARGON2_TIME_COST",
+        "ARGON2_MEMORY_COST",
+        "ARGON2_PARALLELISM",
+        "SCRYPT_WORK_FACTOR",
+    ]
+    if key in os.environ
+}
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/4.0/topics/i18n/
 
@@ -152,6 +251,125 @@ EMAIL_PORT = 587
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 
+# Outgoing e-mails are queued in the outbox (see join/outbox.py). With
+# DELIVERY "thread" they are sent right after the request from a background
+# thread, with "command" only by `manage.py send_outbox --loop`. Both retry
+# failed e-mails with exponential backoff, the thread on a timer.
+
+JOIN_EMAIL_OUTBOX = {
+    "DELIVERY": "thread",
+    "BATCH_SIZE": 50,
+    "MAX_ATTEMPTS": 5,
+    "RETRY_BACKOFF": 60,
+}
+
+# Token authentication cache (see join/authentication.py). Set CACHE_ALIAS
+# to a cache from CACHES shared by all workers to invalidate across them;
+# it then replaces the per-process cache.
+
+JOIN_TOKEN_CACHE = {
+    "TTL": 30,
+    "MAX_SIZE": 10000,
+    "CACHE_ALIAS": None,
+}
+
+# Auth tokens expire after IDLE_TIMEOUT seconds without a request (None for
+# never). `last_seen` is written at most every TOUCH_INTERVAL seconds per
+# token. `manage.py purge_tokens` deletes expired auth and reset tokens.
+
+JOIN_TOKEN_EXPIRY = {
+    "IDLE_TIMEOUT": 14 * 24 * 3600,
+    "TOUCH_INTERVAL": 300,
+}
+
+# API responses are rendered and parsed with orjson when it is installed.
+
+REST_FRAMEWORK = {
+    "DEFAULT_RENDERER_CLASSES": [
+        "join.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "join.parsers.FastJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
+}
+
+# Response compression (see join/middleware.py): brotli when the `brotli`
+# package is installed, gzip otherwise, for JSON bodies of at least MIN_SIZE
+# bytes.
+
+JOIN_COMPRESSION = {
+    "MIN_SIZE": 1024,
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 4,
+}
+
+# Per-view latency, SQL and response size metrics (see join/metrics.py),
+# served to staff users at /metrics/. WINDOW is the number of recent
+# requests per view the latency quantiles are computed from.
+
+JOIN_METRICS = {
+    "ENABLED": True,
+    "WINDOW": 1000,
+}
+
+# Category catalogue (see join/catalogue.py). Each process keeps it for TTL
+# seconds and drops it on category writes; with CACHE_ALIAS set to a shared
+# cache, writes in other workers invalidate it immediately.
+
+JOIN_CATEGORY_CACHE = {
+    "TTL": 60,
+    "CACHE_ALIAS": None,
+}
+
+# Board summary at /tasks/summary/ (see join/summary.py), recomputed after
+# any task write and otherwise at most every TTL seconds; set CACHE_ALIAS to
+# a shared cache to compute it once for all workers.
+
+JOIN_TASK_SUMMARY = {
+    "TTL": 10,
+    "CACHE_ALIAS": None,
+}
+
+# Done tasks not changed for AGE_DAYS days are moved off the board into the
+# archive by `python manage.py archive_tasks` (see join/archive.py), which
+# /tasks/archive/ serves. AGE_DAYS None keeps them on the board.
+
+JOIN_TASK_ARCHIVE = {
+    "AGE_DAYS": 90,
+    "BATCH_SIZE": 500,
+    "DATABASE": "archive" if os.getenv("ARCHIVE_SQLITE_PATH") else "default",
+}
+
+# Delta syncs (/tasks/?since=) hand out cursors CURSOR_MARGIN seconds in
+# the past, so writes committing that much after they started are not
+# missed. Tombstones of deleted tasks are kept TOMBSTONE_DAYS days and
+# purged by `python manage.py purge_tombstones`; older cursors are rejected.
+
+JOIN_TASK_SYNC = {
+    "CURSOR_MARGIN": 60,
+    "TOMBSTONE_DAYS": 30,
+}
+
+# Contact search uses an SQLite FTS5 index (word prefix matching) when the
+# migration could create it; set FTS to False for plain substring matching.
+
+JOIN_CONTACT_SEARCH = {
+    "FTS": True,
+}
+
+# Real-time task events (see join/realtime.py), swap for a shared broker
+# when running more than one ASGI process
+
+JOIN_EVENTS_BROKER = "join.events.InProcessBroker"
+
 # CORS header Config
 
 CORS_ALLOWED_ORIGINS = ["http://localhost:4200", "https://join.tobias-bayer.dev"]
+
+# Conditional requests: the frontend sends If-None-Match and If-Match and
+# reads ETag
+CORS_ALLOW_HEADERS = list(default_headers) + ["if-none-match", "if-match"]
+CORS_EXPOSE_HEADERS = ["ETag", "Server-Timing"]
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite backend tuned for several workers writing to one file.
+
+    New connections get the SQLITE_PRAGMAS (WAL, busy_timeout, ...) and
+    transactions start with BEGIN IMMEDIATE: a deferred transaction that
+    reads first and writes later cannot wait for the write lock under WAL
+    and fails with "database is locked" right away.
+    """
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+
+        for name, value in getattr(settings, "SQLITE_PRAGMAS", {}).items():
+            conn.execute(f"PRAGMA {name} = {value}")
+
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute("BEGIN IMMEDIATE")
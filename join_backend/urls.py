@@ -19,6 +19,11 @@ from django.contrib import admin
 from django.urls import path, include
 from join.views import (
     TaskView,
+    TaskBulkView,
+    TaskSummaryView,
+    ArchivedTaskView,
+    UserTaskView,
+    SubtaskView,
     LoginView,
     LogoutView,
     CreateUserView,
@@ -27,6 +32,7 @@ from join.views import (
     UserListView,
     ContactView,
     checkAuth,
+    MetricsView,
 )
 from join.signals import receiver
 
@@ -35,10 +41,26 @@ urlpatterns = [
     path("login/", LoginView.as_view(), name="login"),
     path("logout/", LogoutView.as_view(), name="logout"),
     path("check_auth/", checkAuth.as_view(), name="check_auth"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
     path("tasks/", TaskView.as_view(), name="tasks"),
     path("tasks/<int:task_id>/", TaskView.as_view(), name="single_task"),
+    path("tasks/bulk/", TaskBulkView.as_view(), name="tasks_bulk"),
+    path("tasks/summary/", TaskSummaryView.as_view(), name="tasks_summary"),
+    path("tasks/archive/", ArchivedTaskView.as_view(), name="tasks_archive"),
+    path(
+        "tasks/archive/<int:task_id>/",
+        ArchivedTaskView.as_view(),
+        name="archived_task",
+    ),
+    path("tasks/<int:task_id>/subtasks/", SubtaskView.as_view(), name="subtasks"),
+    path(
+        "tasks/<int:task_id>/subtasks/<int:subtask_id>/",
+        SubtaskView.as_view(),
+        name="single_subtask",
+    ),
     path("categorys/", CategorysView.as_view(), name="categorys"),
     path("users/", UserListView.as_view(), name="user_list"),
+    path("users/<int:user_id>/tasks/", UserTaskView.as_view(), name="user_tasks"),
     path("create_user/", CreateUserView.as_view(), name="register"),
     path("delete_user/", DeleteUserView.as_view()),
     path("contacts/", ContactView.as_view(), name="contacts"),